@@ -5,13 +5,20 @@ from mysql.connector import Error
 from typing import List
 from datetime import datetime
 from pydantic import BaseModel
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 import base64
 from fastapi import File, UploadFile, Form
 from dateutil import parser as dateutil_parser
 from typing import Optional
-from app.services.ocr_processor import process_base64_images
-from app.services.keyword_extractor import extract_entities_with_ner
+from app.services.ocr_processor import (
+    PREPROCESS_PROFILES, LANG_CODES, get_profile, check_lang_hint, ocr_base64_image, ocr_image_bytes, process_image_bytes, ocr_cache_stats,
+    binary_cache_stats, psm_stats
+)
+from app.services.keyword_extractor import extract_entities_with_ner, analyze_articles
+from app.services.ner_backends import ner_cache_stats
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.job_queue import JobQueue, QueueFullError
+from app.services import metrics
 from fastapi import FastAPI, Query, Request, HTTPException
 from typing import Optional
 import json
@@ -21,6 +28,9 @@ import uvicorn
 import re
 import pymysql
 import os
+import asyncio
+import threading
+import time
 from pathlib import Path
 
 # NER pipeline is disabled - requires HuggingFace authentication
@@ -28,6 +38,40 @@ ner_pipeline = None
 
 app = FastAPI()
 
+# OCR and extraction run here, never on the event loop. Submissions beyond
+# OCR_JOB_MAX_PENDING are refused with 503 instead of queueing forever.
+job_queue = JobQueue(
+    max_workers=int(os.getenv("OCR_JOB_WORKERS", "2")),
+    max_pending=int(os.getenv("OCR_JOB_MAX_PENDING", "32")),
+    ttl=float(os.getenv("OCR_JOB_TTL", "3600"))
+)
+metrics.track_job_queue(job_queue)
+
+
+def submit_job(kind: str, fn, *args, **kwargs):
+    try:
+        return job_queue.submit(kind, fn, *args, **kwargs)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, so /jobs/{job_id} stays one series
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_SECONDS.labels(
+            method=request.method,
+            route=route.path if route else "unmatched",
+            status=str(status)
+        ).observe(time.perf_counter() - started)
 
 
 app.add_middleware(
@@ -39,6 +83,19 @@ app.add_middleware(
 )
 
 
+class TimedDictCursor(pymysql.cursors.DictCursor):
+    """DictCursor that records every execute() in the db_query_seconds metric."""
+
+    def execute(self, query, args=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            metrics.DB_QUERY_SECONDS.labels(
+                statement=metrics.statement_label(query)
+            ).observe(time.perf_counter() - started)
+
+
 def get_connection():
     try:
         connection = pymysql.connect(
@@ -46,7 +103,7 @@ def get_connection():
             user='root',               # Change to your MySQL username
             password='root',  # Change to your MySQL password
             database='cctns_state_db',
-            cursorclass=pymysql.cursors.DictCursor
+            cursorclass=TimedDictCursor
         )
         return connection
     except pymysql.Error as e:
@@ -173,21 +230,237 @@ async def upload_news_image(
     except Exception:
         raise HTTPException(status_code=400, detail="Could not read file")
 
+    try:
+        lang = check_lang_hint(language)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if lang not in LANG_CODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown language '{language}'. Uploads are filed as Hindi or English (LANG_CD 6, 99)"
+        )
+    lang_code = LANG_CODES[lang]
+
     conn = get_connection()
     if not conn:
         raise HTTPException(status_code=500, detail="Database connection failed")
 
     try:
         cursor = conn.cursor()
-        query = "INSERT INTO news_media (language, uploaded_image) VALUES (%s, %s)"
-        cursor.execute(query, (language, contents))
+        # t_news_upload is the table /getnews and the reports read from
+        query = "INSERT INTO t_news_upload (LANG_CD, UPLOADED_IMAGE, RECORD_CREATED_ON) VALUES (%s, %s, %s)"
+        cursor.execute(query, (lang_code, contents, datetime.now()))
+        upload_id = cursor.lastrowid
         conn.commit()
         cursor.close()
         conn.close()
-        return JSONResponse(content={"status": "success", "message": "Image uploaded successfully"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    # OCR right away; if the queue is full the next report OCRs it instead
+    job_id = None
+    try:
+        job = job_queue.submit("ingest-ocr", ocr_news_upload, upload_id, contents, OCR_INGEST_PROFILE, language)
+        track_ingest_job(upload_id, job)
+        job_id = job.id
+    except QueueFullError as e:
+        print(f"Upload {upload_id} not queued for OCR: {e}")
+
+    return JSONResponse(content={
+        "status": "success",
+        "message": "Image uploaded successfully",
+        "upload_id": upload_id,
+        "ocr_job_id": job_id
+    })
+
+
+# ---------------- INGEST-TIME OCR ---------------- #
+# Uploads are OCR'd and run through analyze_articles in the background.
+# The result lands in t_news_ocr keyed by upload id, so a report over a
+# date range is a database read instead of minutes of Tesseract.
+OCR_INGEST_PROFILE = os.getenv("OCR_INGEST_PROFILE") or None
+# Reports only use crime articles, so ingest can skip the rest of the page
+OCR_INGEST_CASCADE = os.getenv("OCR_INGEST_CASCADE", "0") == "1"
+# One row per article block instead of one per page; off until block
+# splitting holds up on real pages (cascade always splits)
+OCR_INGEST_SPLIT = os.getenv("OCR_INGEST_SPLIT", "0") == "1"
+# Word-level output is stored with the text so re-extraction never re-OCRs
+OCR_INGEST_WORDS = os.getenv("OCR_INGEST_WORDS", "1") == "1"
+
+# Upload id -> its ingest job (this process only), so a report started
+# while the job is queued or running doesn't OCR the same upload again
+ingest_jobs = {}
+_ingest_jobs_lock = threading.Lock()
+
+
+def track_ingest_job(upload_id: int, job):
+    cutoff = time.time() - job_queue.ttl
+    with _ingest_jobs_lock:
+        for finished in [uid for uid, j in ingest_jobs.items() if j.done and j.finished_at < cutoff]:
+            del ingest_jobs[finished]
+        ingest_jobs[upload_id] = job
+
+
+def ingest_job_result(upload_id: int):
+    """
+    analyze_articles rows from the upload's ingest job, waiting for it if it
+    is running. None if there is no usable job: never queued, failed, or
+    still queued (it is withdrawn so the caller OCRs the upload itself,
+    instead of waiting on a queue its own job may be blocking).
+    """
+    with _ingest_jobs_lock:
+        job = ingest_jobs.get(upload_id)
+    if job is None:
+        return None
+    if job_queue.cancel(job):
+        with _ingest_jobs_lock:
+            if ingest_jobs.get(upload_id) is job:
+                del ingest_jobs[upload_id]
+        return None
+    if job.status == "cancelled":
+        # Withdrawn by a concurrent report
+        return None
+    job.future.result()
+    return job.result if job.status == "done" else None
+
+NEWS_OCR_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS t_news_ocr (
+        UPLOAD_ID         INT PRIMARY KEY,
+        STATUS            VARCHAR(16) NOT NULL,
+        OCR_PROFILE       VARCHAR(16),
+        OCR_TEXT          LONGTEXT,
+        ARTICLE_INFO      LONGTEXT,
+        OCR_METADATA      TEXT,
+        OCR_WORDS         LONGTEXT,
+        ERROR_MSG         TEXT,
+        RECORD_UPDATED_ON DATETIME NOT NULL
+    )
+"""
+
+_news_ocr_table_ready = False
+
+
+def ensure_news_ocr_table(conn):
+    global _news_ocr_table_ready
+    if _news_ocr_table_ready:
+        return
+    cursor = conn.cursor()
+    cursor.execute(NEWS_OCR_TABLE_SQL)
+    # Tables created before word-level output existed
+    cursor.execute("SHOW COLUMNS FROM t_news_ocr LIKE 'OCR_WORDS'")
+    if not cursor.fetchone():
+        cursor.execute("ALTER TABLE t_news_ocr ADD COLUMN OCR_WORDS LONGTEXT AFTER OCR_METADATA")
+    cursor.close()
+    conn.commit()
+    _news_ocr_table_ready = True
+
+
+def save_news_ocr(upload_id: int, status: str, profile: str, articles=None, article_info=None,
+                  metadata=None, error: str = None, words=None):
+    conn = get_connection()
+    if not conn:
+        raise RuntimeError("Database connection failed")
+
+    try:
+        ensure_news_ocr_table(conn)
+        cursor = conn.cursor()
+        query = """
+            INSERT INTO t_news_ocr
+                (UPLOAD_ID, STATUS, OCR_PROFILE, OCR_TEXT, ARTICLE_INFO, OCR_METADATA, OCR_WORDS, ERROR_MSG,
+                 RECORD_UPDATED_ON)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                STATUS = VALUES(STATUS), OCR_PROFILE = VALUES(OCR_PROFILE), OCR_TEXT = VALUES(OCR_TEXT),
+                ARTICLE_INFO = VALUES(ARTICLE_INFO), OCR_METADATA = VALUES(OCR_METADATA),
+                OCR_WORDS = VALUES(OCR_WORDS), ERROR_MSG = VALUES(ERROR_MSG),
+                RECORD_UPDATED_ON = VALUES(RECORD_UPDATED_ON)
+        """
+        cursor.execute(query, (
+            upload_id, status, profile,
+            json.dumps(articles or [], ensure_ascii=False),
+            json.dumps(article_info or [], ensure_ascii=False),
+            json.dumps(metadata or {}, ensure_ascii=False),
+            json.dumps(words, ensure_ascii=False) if words is not None else None,
+            error, datetime.now()
+        ))
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def ocr_news_upload(upload_id: int, image_bytes: bytes, profile: str = None, lang=None):
+    """OCR one upload, extract its article fields and store both in t_news_ocr."""
+    profile_name = get_profile(profile)["name"]
+    result = ocr_image_bytes(
+        image_bytes, split_articles=OCR_INGEST_SPLIT, profile=profile, lang=lang, cascade=OCR_INGEST_CASCADE,
+        words=OCR_INGEST_WORDS
+    )
+    articles = result["articles"]
+    if not articles and result["metadata"].get("cascade_skipped"):
+        # No crime article on the page: done, nothing to report
+        save_news_ocr(upload_id, "DONE", profile_name, metadata=result["metadata"])
+        return []
+    if not articles:
+        # FAILED rows are retried by the next report run
+        save_news_ocr(upload_id, "FAILED", profile_name, metadata=result["metadata"], error="No text extracted")
+        return []
+
+    article_info = analyze_articles(articles)
+    save_news_ocr(
+        upload_id, "DONE", profile_name, articles, article_info, result["metadata"], words=result.get("words")
+    )
+    return article_info
+
+
+def load_news_keywords(start: datetime, end: datetime, profile: str = None):
+    """
+    analyze_articles rows for every upload in the range. Precomputed rows
+    are read from t_news_ocr; uploads without one are OCR'd now and stored.
+    """
+    conn = get_connection()
+    if not conn:
+        raise HTTPException(status_code=500, detail="DB connection failed")
+
+    try:
+        ensure_news_ocr_table(conn)
+        cursor = conn.cursor()
+        query = """
+            SELECT u.UPLOAD_ID, u.LANG_CD, o.STATUS, o.ARTICLE_INFO
+            FROM t_news_upload u
+            LEFT JOIN t_news_ocr o ON o.UPLOAD_ID = u.UPLOAD_ID
+            WHERE u.RECORD_CREATED_ON BETWEEN %s AND %s
+            ORDER BY u.UPLOAD_ID
+        """
+        cursor.execute(query, (start, end))
+        rows = cursor.fetchall()
+
+        news_keywords = []
+        for row in rows:
+            upload_id = row["UPLOAD_ID"]
+            if row["STATUS"] == "DONE":
+                news_keywords.extend(json.loads(row["ARTICLE_INFO"]))
+                continue
+
+            article_info = ingest_job_result(upload_id)
+            if article_info is not None:
+                news_keywords.extend(article_info)
+                continue
+
+            cursor.execute("SELECT UPLOADED_IMAGE FROM t_news_upload WHERE UPLOAD_ID = %s", (upload_id,))
+            image_blob = cursor.fetchone()["UPLOADED_IMAGE"]
+            if image_blob:
+                try:
+                    news_keywords.extend(ocr_news_upload(upload_id, image_blob, profile, row["LANG_CD"]))
+                except Exception as e:
+                    print(f"Error processing news image {upload_id}: {str(e)}")
+                    continue
+        cursor.close()
+    finally:
+        conn.close()
+
+    return news_keywords
+
 
 
 
@@ -426,12 +699,35 @@ class UploadData(BaseModel):
         uploadedImage:  str
 
 
+def extract_article_fields(ocr_result: dict) -> dict:
+    """The /extract-articles response fields for one OCR result."""
+    structured_articles = ocr_result["articles"]
+    crimeType=extract_crime_keywords(structured_articles);
+    psName=extract_police_station(structured_articles[0])
+    accusedName=extract_accused(structured_articles[0]);
+    complainantName=extract_complainant(structured_articles[0]);
+    dsName=extract_district(structured_articles[0])
+    distictCode= get_district_Code( 33,dsName)
+    heading, summary = extract_summary_string(accusedName, psName, complainantName, '', dsName, crimeType)
+
+    fields = {"distictCd": distictCode['DISTRICT_CD'], "districtName": dsName, "psName" :psName , "accusedName" : accusedName, "complainantName":"","crimeType" :crimeType, "newsHeading":  heading, "summary": summary,"full_text":structured_articles[0], "ocrMetadata": ocr_result["metadata"]}
+    if "words" in ocr_result:
+        # Word columns of full_text: text, conf, left, top, width, height, block_num, par_num, line_num
+        fields["words"] = ocr_result["words"][0]
+    return fields
+
+
 @app.post("/extract-articles")
 async def extract_news_articles(
     uploadData: UploadData,
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    last_24_hours: Optional[bool] = Query(False)
+    last_24_hours: Optional[bool] = Query(False),
+    source: Optional[str] = Query(None, description="Newspaper name; keys the learned PSM order"),
+    profile: Optional[str] = Query(None, description="OCR preprocessing profile: fast, balanced or quality"),
+    lang: Optional[str] = Query(None, description="Language hint (Hindi, English, LANG_CD or Tesseract codes); detected when omitted"),
+    cascade: Optional[bool] = Query(None, description="Only fully OCR article blocks whose headline mentions a crime"),
+    words: Optional[bool] = Query(None, description="Also return word-level OCR output (text, box, confidence, block/par/line)")
 ):
     
     #print(uploadData)
@@ -439,41 +735,112 @@ async def extract_news_articles(
      
     #image_base64 = base64.b64encode(bytes_representation).decode('utf-8');
     # 1. Reuse get_news to fetch image records
-    
-
-    print (uploadData.uploadedImage);
-    
 
 
     # 3. OCR processing
-    structured_articles = process_base64_images(uploadData.uploadedImage)
-    crime_type_hi = [
-        "हत्या", "हत्या का प्रयास", "बलात्कार", "बलात्कार का प्रयास", "छेड़छाड़", "दुष्कर्म", "अपहरण", "डकैती", "लूट", "चोरी",
-        "गृहभेदन", "मारपीट", "धोखाधड़ी", "ठगी", "घूसखोरी", "साइबर अपराध", "नकली नोट", "नशीली दवाओं की तस्करी", "शराब तस्करी",
-        "मानव तस्करी", "घरेलू हिंसा", "आतंकवाद", "देशद्रोह", "धार्मिक उन्माद", "नाबालिग से दुष्कर्म", "पत्नि पर अत्याचार",
-        "आत्महत्या के लिए उकसाना", "धमकी देना", "अवैध हथियार रखना", "हथियारों की तस्करी", "जुआ", "मादक पदार्थ तस्करी",
-        "नशीली दवाओं की तस्करी", "तस्करी", "नक्सली", "आत्मसमर्पण", "ईनामी", "पुनर्वास नीति", "माओवाद", "गांजा", "मादक पदार्थ",
-        "एनडीपीएस", "बिक्री", "अवैध परिवहन", "नक्सलवाद", "देशद्रोह", "गौ हत्या", "गौ तस्करी","गायों", "देह व्यापार"
-    ]
-    
-    crimeType=extract_crime_keywords(structured_articles);
-    psName=extract_police_station(structured_articles[0])
-    accusedName=extract_accused(structured_articles[0]);
-    complainantName=extract_complainant(structured_articles[0]);
-    dsName=extract_district(structured_articles[0])
-    print (accusedName)
-    print (psName)
-    print (complainantName)
-    ps_name_db=extract_ps_keywords(structured_articles[0])
-    #structured_articles.append(psName);
-    print(ps_name_db)
-    distictCode= get_district_Code( 33,dsName)
-    #dsName = get_district_name(distictCode, 33)
-    heading, summary = extract_summary_string(accusedName, psName, complainantName, '', dsName, crimeType)
-    #structured_articles.append(heading)
-    #structured_articles.append(summary)
-    
-    return {"distictCd": distictCode['DISTRICT_CD'], "districtName": dsName, "psName" :psName , "accusedName" : accusedName, "complainantName":"","crimeType" :crimeType, "newsHeading":  heading, "summary": summary,"full_text":structured_articles[0]}
+    try:
+        get_profile(profile)
+        check_lang_hint(lang)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job = submit_job(
+        "extract-articles", extract_articles_from_base64, uploadData.uploadedImage, source, profile, lang, cascade,
+        words
+    )
+    await asyncio.wrap_future(job.future)
+    if job.status == "failed":
+        raise HTTPException(status_code=job.status_code, detail=job.error)
+    return job.result
+
+
+def extract_articles_from_base64(base64_image: str, source: str = None, profile: str = None, lang: str = None,
+                                 cascade: bool = None, words: bool = None) -> dict:
+    ocr_result = ocr_base64_image(
+        base64_image, source=source, profile=profile, lang=lang, cascade=cascade, words=words
+    )
+    if not ocr_result["articles"]:
+        raise HTTPException(status_code=422, detail=no_articles_message(ocr_result))
+    return extract_article_fields(ocr_result)
+
+
+def no_articles_message(ocr_result: dict) -> str:
+    skipped = ocr_result["metadata"].get("cascade_skipped")
+    if skipped:
+        return f"No crime article found ({skipped} blocks skipped by the cascade pre-filter)"
+    return "No text extracted"
+
+
+# ---------------- BATCH OCR ---------------- #
+# Each image is one job on the shared job queue; its PSM passes still go to
+# the OCR pool, so jobs never nest tasks in the pool they run on.
+def extract_batch_item(index: int, filename: str, image_bytes: bytes, source: str = None, profile: str = None,
+                       lang: str = None, cascade: bool = None, words: bool = None) -> dict:
+    """One NDJSON line of /extract-articles/batch; failures are reported, not raised."""
+    item = {"index": index, "filename": filename}
+    try:
+        ocr_result = ocr_image_bytes(
+            image_bytes, source=source, profile=profile, lang=lang, cascade=cascade, words=words
+        )
+        if not ocr_result["articles"]:
+            item["error"] = no_articles_message(ocr_result)
+            item["ocrMetadata"] = ocr_result["metadata"]
+            return item
+        item.update(extract_article_fields(ocr_result))
+    except HTTPException as e:
+        item["error"] = e.detail
+    except Exception as e:
+        item["error"] = str(e)
+    return item
+
+
+@app.post("/extract-articles/batch")
+async def extract_news_articles_batch(
+    files: List[UploadFile] = File(...),
+    source: Optional[str] = Form(None),
+    profile: Optional[str] = Form(None),
+    language: Optional[str] = Form(None),
+    cascade: Optional[bool] = Form(None),
+    words: Optional[bool] = Form(None)
+):
+    """
+    OCR many newspaper images from one multipart request. Streams one NDJSON
+    line per image as soon as it finishes (completion order, not upload
+    order), with the /extract-articles fields plus "index" and "filename".
+    The whole batch is refused with 503 if the job queue can't take it, and
+    with 413 if it has more images than the queue ever holds.
+    """
+    try:
+        get_profile(profile)
+        check_lang_hint(language)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(files) > job_queue.max_pending:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {job_queue.max_pending} images per batch (OCR_JOB_MAX_PENDING), got {len(files)}"
+        )
+
+    uploads = []
+    for file in files:
+        try:
+            uploads.append((file.filename, await file.read()))
+        except Exception:
+            raise HTTPException(status_code=400, detail=f"Could not read file {file.filename}")
+
+    try:
+        jobs = job_queue.submit_many("extract-articles-batch", extract_batch_item, [
+            (index, filename, image_bytes, source, profile, language, cascade, words)
+            for index, (filename, image_bytes) in enumerate(uploads)
+        ])
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+
+    async def stream_results():
+        for finished in asyncio.as_completed([asyncio.wrap_future(job.future) for job in jobs]):
+            job = await finished
+            yield json.dumps(job.result, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
 
 chhattisgarh_districts = [
     # Hindi, English
@@ -785,29 +1152,27 @@ def extract_complainant(text):
     return "N/A"
 
 
-def extract_crime_keywords(structured_articles):
-    
-    crime_type_hi = [
-        "हत्या","कत्ल","खून",
+crime_keywords_hi = [
+    "हत्या","कत्ल","खून",
 
-        "हत्या का प्रयास","कत्ल का प्रयास","खून का प्रयास","हत्या की कोशिश","कत्ल की प्रयास","खून की प्रयास","डकैती",
-        "बलात्कार", "बलात्कार का प्रयास", "छेड़छाड़", "दुष्कर्म","दुष्कर्म का प्रयास", "अपहरण", "डकैती", "लूट", "चोरी",
-        "गृहभेदन", "मारपीट", "धोखाधड़ी", "ठगी", "घूसखोरी", "साइबर अपराध", "नकली नोट", "नशीली दवाओं की तस्करी", "नशीली दवा", "शराब तस्करी",
-        "मानव तस्करी", "घरेलू हिंसा", "आतंकवाद", "देशद्रोह", "धार्मिक उन्माद", "नाबालिग से दुष्कर्म", "पत्नि पर अत्याचार",
-        "आत्महत्या के लिए उकसाना", "धमकी देना", "अवैध हथियार रखना", "हथियारों की तस्करी", "जुआ", "मादक पदार्थ तस्करी",
-        "नशीली दवाओं की तस्करी", "तस्करी", "नक्सली", "आत्मसमर्पण", "ईनामी", "पुनर्वास नीति", "माओवाद", "गांजा", "मादक पदार्थ",
-        "एनडीपीएस", "बिक्री", "अवैध परिवहन", "नक्सलवाद", "देशद्रोह", "गौ हत्या", "गौ-तस्करी","गायो","देह व्यापार","जिलेटिन","डेटोनेटर"
-    ]
+    "हत्या का प्रयास","कत्ल का प्रयास","खून का प्रयास","हत्या की कोशिश","कत्ल की प्रयास","खून की प्रयास","डकैती",
+    "बलात्कार", "बलात्कार का प्रयास", "छेड़छाड़", "दुष्कर्म","दुष्कर्म का प्रयास", "अपहरण", "डकैती", "लूट", "चोरी",
+    "गृहभेदन", "मारपीट", "धोखाधड़ी", "ठगी", "घूसखोरी", "साइबर अपराध", "नकली नोट", "नशीली दवाओं की तस्करी", "नशीली दवा", "शराब तस्करी",
+    "मानव तस्करी", "घरेलू हिंसा", "आतंकवाद", "देशद्रोह", "धार्मिक उन्माद", "नाबालिग से दुष्कर्म", "पत्नि पर अत्याचार",
+    "आत्महत्या के लिए उकसाना", "धमकी देना", "अवैध हथियार रखना", "हथियारों की तस्करी", "जुआ", "मादक पदार्थ तस्करी",
+    "नशीली दवाओं की तस्करी", "तस्करी", "नक्सली", "आत्मसमर्पण", "ईनामी", "पुनर्वास नीति", "माओवाद", "गांजा", "मादक पदार्थ",
+    "एनडीपीएस", "बिक्री", "अवैध परिवहन", "नक्सलवाद", "देशद्रोह", "गौ हत्या", "गौ-तस्करी","गायो","देह व्यापार","जिलेटिन","डेटोनेटर"
+]
 
-    
-    found_matches = []
-    for crime in crime_type_hi:
-        matches = re.findall(crime, structured_articles[0])
-        if matches:
-            found_matches.extend(matches)
-   
-    print(f"' contains the pattern {len(found_matches)}'")
-    unique_elements = list(set(found_matches))
+# One pass over the article finds every keyword, instead of a regex scan per keyword
+crime_keyword_matcher = KeywordMatcher({"crime": crime_keywords_hi})
+
+
+def extract_crime_keywords(structured_articles):
+    hits = crime_keyword_matcher.find(structured_articles[0])
+
+    print(f"' contains the pattern {sum(len(starts) for starts in hits.positions.values())}'")
+    unique_elements = list(dict.fromkeys(hits.found("crime")))
     result = ", ".join(unique_elements)
     print(result)
     return unique_elements
@@ -824,7 +1189,8 @@ def auto_extract_keywords(
     request: Request,
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    last_24_hours: Optional[bool] = Query(False)
+    last_24_hours: Optional[bool] = Query(False),
+    profile: Optional[str] = Query(None, description="OCR preprocessing profile: fast, balanced or quality")
 ):
     import json
 
@@ -840,37 +1206,16 @@ def auto_extract_keywords(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
 
+    try:
+        get_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     fir_start = start - timedelta(days=7)
     fir_end = end
 
-    # --- Step 1: Get News Images from Database ---
-    conn = get_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="DB connection failed")
-
-    cursor = conn.cursor()
-    query = """
-        SELECT UPLOAD_ID, LANG_CD, UPLOADED_IMAGE, RECORD_CREATED_ON
-        FROM t_news_upload
-        WHERE RECORD_CREATED_ON BETWEEN %s AND %s
-    """
-    cursor.execute(query, (start, end))
-    rows = cursor.fetchall()
-    cursor.close()
-    conn.close()
-
-    # Extract articles from news images if available
-    articles = []
-    for upload_id, lang_cd, image_blob, created_on in rows:
-        if image_blob:
-            try:
-                image_base64 = base64.b64encode(image_blob).decode('utf-8') # type: ignore
-                structured_articles = process_base64_images(image_base64)
-                if structured_articles:
-                    articles.extend(structured_articles)
-            except Exception as e:
-                print(f"Error processing news image {upload_id}: {str(e)}")
-                continue
+    # --- Step 1: News article keywords (precomputed at upload time) ---
+    news_keywords = load_news_keywords(start, end, profile)
 
     # --- Step 2: Get FIR Records ---
     # Query FIR records directly instead of calling the endpoint
@@ -895,12 +1240,11 @@ def auto_extract_keywords(
         if item.get("FIR_CONTENTS") and len(item["FIR_CONTENTS"].strip()) > 30
     ]
 
-    if not articles and not fir_texts:
+    if not news_keywords and not fir_texts:
         raise HTTPException(status_code=404, detail="No valid news or FIR text to extract.")
 
     # --- Step 3: Keyword Extraction ---
-    news_keywords = analyze_articles(articles) if articles else []
-    fir_keywords = analyze_articles(fir_texts) if fir_texts else []
+    fir_keywords = analyze_articles(fir_texts, parallel=True) if fir_texts else []
 
     return {
         "news_keywords": news_keywords,
@@ -1064,7 +1408,8 @@ from app.services.keyword_extractor import analyze_articles
 def generate_final_summary(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    last_24_hours: Optional[bool] = Query(False)
+    last_24_hours: Optional[bool] = Query(False),
+    profile: Optional[str] = Query(None, description="OCR preprocessing profile: fast, balanced or quality")
 ):
     # Step 1: Parse date range
     try:
@@ -1079,40 +1424,17 @@ def generate_final_summary(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
 
-    # Step 2: Fetch news images from database
-    conn = get_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="DB connection failed")
+    try:
+        get_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    cursor = conn.cursor()
-    query = """
-        SELECT UPLOAD_ID, LANG_CD, UPLOADED_IMAGE, RECORD_CREATED_ON
-        FROM t_news_upload
-        WHERE RECORD_CREATED_ON BETWEEN %s AND %s
-    """
-    cursor.execute(query, (start_dt, end_dt))
-    rows = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    # Step 2: News article keywords (precomputed at upload time)
+    all_info_2d_list = load_news_keywords(start_dt, end_dt, profile)
 
-    # Extract articles from news images
-    articles = []
-    for upload_id, _lang_cd, image_blob, _created_on in rows:
-        if image_blob:
-            try:
-                image_base64 = base64.b64encode(image_blob).decode('utf-8') # type: ignore
-                structured_articles = process_base64_images(image_base64)
-                if structured_articles:
-                    articles.extend(structured_articles)
-            except Exception as e:
-                print(f"Error processing news image {upload_id}: {str(e)}")
-                continue
-
-    if not articles:
+    if not all_info_2d_list:
         raise HTTPException(status_code=404, detail="No news articles found.")
 
-    all_info_2d_list = analyze_articles(articles)
-
     # Step 3: Compute FIR time range (7 days back from start)
     fir_start = start_dt - timedelta(days=7)
     fir_end = end_dt
@@ -1139,7 +1461,7 @@ def generate_final_summary(
         for item in fir_list
         if item.get("FIR_CONTENTS") and len(item["FIR_CONTENTS"].strip()) > 30
     ]
-    fir_info_2d_list = analyze_articles(fir_texts) if fir_texts else []
+    fir_info_2d_list = analyze_articles(fir_texts, parallel=True) if fir_texts else []
 
     # Step 5: Load law_hi
     law_hi = get_law_hi()
@@ -1204,7 +1526,7 @@ def extract_local_newspaper():
             image_base64 = base64.b64encode(image_bytes).decode('utf-8')
 
         # Process the image using OCR
-        structured_articles = process_base64_images(image_base64)
+        structured_articles = process_image_bytes(image_bytes)
 
         # Debug: Print extracted text
         print("=" * 80)
@@ -1287,5 +1609,135 @@ def extract_local_newspaper():
 def health_check():
     return {"status": "ok"}
 
+
+@app.get("/metrics")
+def get_metrics():
+    """
+    Prometheus metrics: OCR stage/pass latency, DB query latency, request latency, cache and job queue
+    """
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/ocr-cache/stats")
+def get_ocr_cache_stats():
+    """
+    Hit/miss statistics of the shared OCR result cache
+    """
+    return ocr_cache_stats()
+
+
+@app.get("/ocr-cache/binaries/stats")
+def get_binary_cache_stats():
+    """
+    Hit/miss statistics of the on-disk cache of preprocessed (binarized) images
+    """
+    return binary_cache_stats()
+
+
+@app.get("/ner-cache/stats")
+def get_ner_cache_stats():
+    """
+    Hit/miss statistics of the NER result cache (memory tier of the serving process, pool workers' memory tiers, optional disk tier)
+    """
+    return ner_cache_stats()
+
+
+@app.get("/ocr/psm-stats")
+def get_psm_stats():
+    """
+    How often each Tesseract PSM won, per newspaper source (adaptive OCR mode)
+    """
+    return {source: {"wins": wins, "order": psm_stats.order(source)} for source, wins in psm_stats.wins.items()}
+
+
+@app.get("/ocr/profiles")
+def get_ocr_profiles():
+    """
+    Available OCR preprocessing profiles and the default one
+    """
+    return {
+        "default": get_profile()["name"],
+        "profiles": {
+            name: {"psm_modes": settings["psm_modes"], "max_scale": settings["max_scale"], "fallback": settings["fallback"]}
+            for name, settings in PREPROCESS_PROFILES.items()
+        },
+    }
+
+
+@app.post("/jobs/extract-articles", status_code=202)
+def submit_extract_articles_job(
+    uploadData: UploadData,
+    source: Optional[str] = Query(None, description="Newspaper name; keys the learned PSM order"),
+    profile: Optional[str] = Query(None, description="OCR preprocessing profile: fast, balanced or quality"),
+    lang: Optional[str] = Query(None, description="Language hint (Hindi, English, LANG_CD or Tesseract codes); detected when omitted"),
+    cascade: Optional[bool] = Query(None, description="Only fully OCR article blocks whose headline mentions a crime"),
+    words: Optional[bool] = Query(None, description="Also return word-level OCR output (text, box, confidence, block/par/line)")
+):
+    """
+    Queue /extract-articles work; poll GET /jobs/{job_id} for the result
+    """
+    try:
+        get_profile(profile)
+        check_lang_hint(lang)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job = submit_job(
+        "extract-articles", extract_articles_from_base64, uploadData.uploadedImage, source, profile, lang, cascade,
+        words
+    )
+    return {"job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"}
+
+
+@app.post("/jobs/generate-report", status_code=202)
+def submit_generate_report_job(
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    last_24_hours: Optional[bool] = Query(False),
+    profile: Optional[str] = Query(None, description="OCR preprocessing profile: fast, balanced or quality")
+):
+    """
+    Queue a /generate-report run; poll GET /jobs/{job_id} for the result
+    """
+    try:
+        get_profile(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job = submit_job(
+        "generate-report", generate_final_summary,
+        start_date=start_date, end_date=end_date, last_24_hours=last_24_hours, profile=profile
+    )
+    return {"job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"}
+
+
+@app.get("/jobs/stats")
+def get_job_stats():
+    """
+    Job queue depth and worker usage
+    """
+    return job_queue.stats()
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    wait: Optional[float] = Query(0, ge=0, le=60, description="Long-poll: seconds to wait for the job to finish")
+):
+    """
+    Job status, plus the result (or error) once it has finished
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if wait and not job.done:
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+    return job.to_dict()
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=5000)
@@ -0,0 +1,138 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while max_pending jobs are queued or running."""
+
+
+class Job:
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.status_code = None
+        self.future = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    def to_dict(self) -> dict:
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.status == "done":
+            data["result"] = self.result
+        elif self.status == "failed":
+            data["error"] = self.error
+            data["status_code"] = self.status_code
+        return data
+
+
+class JobQueue:
+    """
+    Bounded background executor for CPU-heavy work (OCR, extraction).
+
+    At most max_workers jobs run at once and at most max_pending are queued
+    or running; beyond that submit() raises QueueFullError so the caller can
+    answer 503 instead of letting the backlog grow. Finished jobs are kept
+    for ttl seconds so clients can fetch their results.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, ttl: float = 3600):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._pending = 0
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn, *args, **kwargs) -> Job:
+        return self.submit_many(kind, fn, [args], kwargs)[0]
+
+    def submit_many(self, kind: str, fn, arg_tuples, kwargs=None) -> list:
+        """
+        One job per argument tuple, all or nothing: if the queue can't take
+        every job, QueueFullError is raised and none is queued. More than
+        max_pending jobs never fit, even in an idle queue: ValueError.
+        """
+        jobs = [Job(kind) for _ in arg_tuples]
+        if len(jobs) > self.max_pending:
+            raise ValueError(f"At most {self.max_pending} jobs can be submitted together, got {len(jobs)}")
+        with self._lock:
+            self._purge()
+            if self._pending + len(jobs) > self.max_pending:
+                raise QueueFullError(f"Job queue is full ({self.max_pending} pending)")
+            self._pending += len(jobs)
+            for job in jobs:
+                self._jobs[job.id] = job
+        # job.future resolves to the job itself once it has finished
+        for job, args in zip(jobs, arg_tuples):
+            job.future = self._executor.submit(self._run, job, fn, args, kwargs or {})
+        return jobs
+
+    def cancel(self, job: Job) -> bool:
+        """Withdraw a job that hasn't started; False once it is running, finished or cancelled."""
+        with self._lock:
+            # Future.cancel() is also True for an already cancelled future
+            if job.status != "queued" or job.future is None or not job.future.cancel():
+                return False
+            self._pending -= 1
+            job.status = "cancelled"
+            job.finished_at = time.time()
+        return True
+
+    def _run(self, job: Job, fn, args, kwargs) -> Job:
+        with self._lock:
+            self._running += 1
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = "done"
+        except Exception as e:
+            # HTTPException-style errors keep their status code and detail
+            job.status_code = getattr(e, "status_code", 500)
+            job.error = getattr(e, "detail", None) or str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+        return job
+
+    def _purge(self):
+        cutoff = time.time() - self.ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "queued": self._pending - self._running,
+                "running": self._running,
+                "retained": len(self._jobs),
+            }
@@ -1,16 +1,15 @@
 import re
 import os
-from dotenv import load_dotenv
-from huggingface_hub import InferenceClient
+import threading
+import multiprocessing
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import lru_cache
 
-# Load environment variables
-load_dotenv()
-
-# Initialize HuggingFace InferenceClient
-client = InferenceClient(
-    provider="hf-inference",
-    api_key=os.environ["HUGGINGFACE_TOKEN"],
-)
+from app.services.keyword_matcher import KeywordMatcher, word_bounded
+from app.services.ner_backends import add_worker_ner_counts, ner_backend_installed, ner_memory_counts, tag_texts
 
 police_crime_types_input = ["पुलिस की लापरवाही", "पुलिस द्वारा अपराध", "गंभीर अपराध", "कानून व्यवस्था", "विभागीय नकारात्मक समाचार"]
 police_crime_examples = ["रिपोर्ट दर्ज न करना", "अपराधी को जानते हुए भी उसे गिरफ्तार न करना", "शिकायत पर कार्यवाही नहीं करना", "प्रार्थी/पीड़ितों/गवाहों के साथ दुर्व्यवहार", "जुआ/सट्टेबाजों को संरक्षण देना", "आपात स्थिति मे कोई प्रतिक्रिया नहीं देना", "झूठे मामले में निर्दोष के विरूद्ध कार्यवाही करना", "आरोपी के साथ अमानवीय व्यवहार", "रिश्वत/भ्रष्टाचार कर आरोपी पक्ष को लाभ पहुंचाना", "अपराध दर्ज करने के लिए पैसे की मांग करना", "कानूनी प्रक्रिया की अनदेखी करना", "न्यायालय के आदेषों का अवहेलना करना", "मादक पदार्थों की तस्करी में संलिप्तता", "गुण्डा/बदमाषों को संरक्षण देना", "पुलिस अधिकारी/कर्मचारियों द्वारा कारित अपराध", "अवैध गतिविधियों की अनदेखा करना", "साम्प्रदायिक हिंसा", "धर्मान्तरण", "अवैध/अनाधिकृत प्रवासी", "कमजोर आसूचना तंत्र", "जनता के साथ संवादहीनता", "पुलिसकर्मियों द्वारा आत्महत्या", "ट्रांसफर/पोस्टिंग से जुड़ा असंतोष", "अनुकंपा नियुक्ति नहीं मिलना", "हत्या", "बलात्कार", "डकैती", "लूट", "गैंगवार", "चाकूबाजी", "फायरिंग", "गैंगरेप", "गौ-तस्करी", "मानव तस्करी", "गुमषुदा बच्चे/महिला"]
@@ -137,27 +136,50 @@ occasion = {
     "कॉलेज फेस्ट": 6, "लोकल मेला": 5, "खेलकूद का आयोजन": 6
 }
 
+# Every crime keyword; the OCR cascade screens article headlines against these
+crime_screening_keywords = sorted(set(crime_severity_sorted) | set(crime_type) | set(crimes_by_police))
+
+# All vocabularies in one automaton: a text is scanned once and every
+# extract_* below is a lookup over the hits (see find_keywords)
+vocabulary = KeywordMatcher({
+    "crime_severity": list(crime_severity_sorted),
+    "crime_type": crime_type,
+    "crimes_by_police": crimes_by_police,
+    "screening": crime_screening_keywords,
+    "weapons": weapons_keywords,
+    "score_match": score_match,
+    "occasion": list(occasion),
+    "police_station": chhattisgarh_police_stations,
+    "station_part": sorted({part for station in chhattisgarh_police_stations for part in station.split()}),
+    "proximity": ["सिहावा", "थाना"],
+})
+
+
+@lru_cache(maxsize=256)
+def find_keywords(text):
+    """Every vocabulary hit in text. Cached, since each article goes through several extract_* calls."""
+    return vocabulary.find(text)
 
 
 
 
 
 
-# NER function using HuggingFace InferenceClient
+
+# NER through the configured backend and the NER cache (see ner_backends)
 def extract_entities_with_ner(text):
-    """Extract named entities using HuggingFace InferenceClient"""
-    if not client:
-        return []
-    
+    """Extract named entities from one text"""
+    return extract_entities_with_ner_batch([text])[0]
+
+
+def extract_entities_with_ner_batch(texts):
+    """Entity lists for several texts, tagged in one backend call"""
+    texts = list(texts)
     try:
-        result = client.token_classification(
-            text,
-            model="ai4bharat/IndicNER",
-        )
-        return result
+        return tag_texts(texts)
     except Exception as e:
         print(f"NER inference error: {e}")
-        return []
+        return [[] for _ in texts]
 
 # from .resources import (
 #     crime_severity_sorted,
@@ -182,51 +204,107 @@ def extract_date(text):
     match = re.search(r'\b\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}\b', text)
     return match.group() if match else "N/A"
 
+class DistrictResolver:
+    """
+    Built once for a district list. A district counts when it appears as a
+    whole word on the same line as पुलिस (either side), as the regexes
+    fr'\b{d}\b.*पुलिस' and fr'पुलिस.*\b{d}\b' used to decide; districts
+    are tried in list order. Otherwise the "जिला <name>" phrases decide.
+
+    One keyword pass gives every district and पुलिस position; each line's
+    last पुलिस start and first पुलिस end then answer both directions,
+    instead of two backtracking regex scans per district.
+    """
+
+    def __init__(self, districts, anchor="पुलिस"):
+        self.districts = list(districts)
+        self.anchor = anchor
+        self._matcher = KeywordMatcher({"district": self.districts, "anchor": [anchor]})
+        self._district_phrase = re.compile(r'जिला\s+([^\n।:,]*)')
+        self._chowki_district_phrase = re.compile(r'चौकी\s+[^\n।:,]*\s+जिला\s+([^\n।:,]*)')
+
+    def near_anchor(self, text):
+        """First district (list order) on the same line as the anchor, or None."""
+        hits = self._matcher.find(text)
+        anchors = hits.positions.get(self.anchor)
+        if not anchors:
+            return None
+        newlines = [m.start() for m in re.finditer("\n", text)]
+
+        def line(i):
+            return bisect_left(newlines, i)
+
+        # Per line: the last anchor start and the first anchor end
+        last_start, first_end = {}, {}
+        for start in anchors:
+            last_start[line(start)] = start
+            first_end.setdefault(line(start + len(self.anchor)), start + len(self.anchor))
+
+        for district in self.districts:
+            for start in hits.positions.get(district, ()):
+                end = start + len(district)
+                if not word_bounded(text, start, end):
+                    continue
+                if last_start.get(line(end), -1) >= end or first_end.get(line(start), end + 1) <= start:
+                    return district
+        return None
+
+    def resolve(self, text):
+        district = self.near_anchor(text)
+        if district:
+            return district
+        possible_districts = []
+        match = self._district_phrase.search(text)
+        if match:
+            possible_districts.append(match.group(1).strip())
+        match_alt = self._chowki_district_phrase.search(text)
+        if match_alt:
+            possible_districts.append(match_alt.group(1).strip())
+        for district in possible_districts:
+            for known_district in self.districts:
+                if known_district in district:
+                    return known_district
+        return "N/A"
+
+    def resolve_many(self, texts):
+        return [self.resolve(text) for text in texts]
+
+
+district_resolver = DistrictResolver(chhattisgarh_districts)
+
+
 def extract_district(text):
-    possible_districts = []
-    match = re.search(r'जिला\s+([^\n।:,]*)', text)
-    if match:
-        possible_districts.append(match.group(1).strip())
-    match_alt = re.search(r'चौकी\s+[^\n।:,]*\s+जिला\s+([^\n।:,]*)', text)
-    if match_alt:
-        possible_districts.append(match_alt.group(1).strip())
-    for known_district in chhattisgarh_districts:
-        if re.search(fr'\b{known_district}\b.*पुलिस', text) or re.search(fr'पुलिस.*\b{known_district}\b', text):
-            return known_district
-    for district in possible_districts:
-        for known_district in chhattisgarh_districts:
-            if known_district in district:
-                return known_district
-    return "N/A"
+    return district_resolver.resolve(text)
 
 def extract_police_station(text):
     print(f"DEBUG: Extracting police station from text: {text[:100]}...")
     
+    hits = find_keywords(text)
+
     # Special handling for सिहावा - check if it appears with थाना
-    if "सिहावा" in text and "थाना" in text:
+    if "सिहावा" in hits and "थाना" in hits:
         # Look for सिहावा within 20 characters of थाना
-        sihawa_pos = text.find("सिहावा")
-        thana_pos = text.find("थाना")
+        sihawa_pos = hits.first("सिहावा")
+        thana_pos = hits.first("थाना")
         if abs(sihawa_pos - thana_pos) < 20:
             print("DEBUG: Found सिहावा थाना by proximity matching")
             return "सिहावा थाना"
     
     # First try to match exact police station names from the list
-    for station in chhattisgarh_police_stations:
-        if station in text:
-            print(f"DEBUG: Found exact match: {station}")
-            return station
+    for station in hits.found("police_station"):
+        print(f"DEBUG: Found exact match: {station}")
+        return station
     
     # Try partial matching - sometimes OCR might miss spaces or have slight variations
     for station in chhattisgarh_police_stations:
         station_parts = station.split()
         for part in station_parts:
-            if part in text and len(part) > 2:  # Only match meaningful parts
+            if part in hits and len(part) > 2:  # Only match meaningful parts
                 # Check if other parts are also nearby
-                text_start = max(0, text.find(part) - 20)
-                text_end = min(len(text), text.find(part) + 50)
-                context = text[text_start:text_end]
-                if all(other_part in context for other_part in station_parts if other_part != part):
+                text_start = max(0, hits.first(part) - 20)
+                text_end = min(len(text), hits.first(part) + 50)
+                if all(hits.occurs_within(other_part, text_start, text_end)
+                       for other_part in station_parts if other_part != part):
                     print(f"DEBUG: Found partial match: {station}")
                     return station
     
@@ -253,7 +331,8 @@ def extract_complainant(text):
     match = re.search(r'प्रार्थी\s+([^\s,।\n]+(?:\s+[^\s,।\n]+)?)', text)
     return match.group(1) if match else "N/A"
 
-def extract_accused(text):
+def accused_from_patterns(text):
+    """The accused named by "गिरफ्तार आरोपी - ..." or "आरोपी ...", None if neither matches."""
     match = re.search(r'गिरफ्तार आरोपी\s*-\s*([^\n]*)', text)
     if match:
         name = match.group(1).split('पिता')[0].strip()
@@ -262,31 +341,36 @@ def extract_accused(text):
     match_alt = re.search(r'आरोपी\s+([^\s,।\n]+(?:\s+[^\s,।\n]+)?)', text)
     if match_alt:
         return match_alt.group(1)
+    return None
+
+def extract_accused(text, ner_results=None):
+    """ner_results: the text's entities, if the caller already tagged it in a batch."""
+    name = accused_from_patterns(text)
+    if name is not None:
+        return name
     # Use NER inference if available
-    ner_results = extract_entities_with_ner(text)
+    if ner_results is None:
+        ner_results = extract_entities_with_ner(text)
     if ner_results:
         persons = [ent['word'] for ent in ner_results if ent.get('entity_group') == 'PER']
         return persons[0] if persons else "N/A"
     return "N/A"
 
 def extract_weapons(text):
-    found = [word for word in weapons_keywords if word in text]
+    found = find_keywords(text).found("weapons")
     return ', '.join(found) if found else "N/A"
 
 def extract_crime_type(text):
-    for crime in crime_severity_sorted.keys():
-        if crime in text:
-            return crime
+    for crime in find_keywords(text).found("crime_severity"):
+        return crime
     return "N/A"
 
-def extract_score(text):
-    score = 0
-    for i in score_match:
-        if i in text:
-            score += 1
-    for i in occasion.keys():
-        if i in text:
-            score += occasion[i]
+def extract_score(text, crime=None):
+    """crime: the article's extract_crime_type(), if the caller already has it."""
+    hits = find_keywords(text)
+    score = len(hits.found("score_match"))
+    for i in hits.found("occasion"):
+        score += occasion[i]
 
     word_to_number = {
         "शून्य": 0, "एक": 1, "दो": 2, "तीन": 3, "चार": 4, "पांच": 5,
@@ -301,7 +385,8 @@ def extract_score(text):
     def extract_number_from_words(w):
         return word_to_number.get(w.strip(), 0)
 
-    crime = extract_crime_type(text)
+    if crime is None:
+        crime = extract_crime_type(text)
     if crime in crime_severity_sorted:
         score += crime_severity_sorted[crime]
         if crime == "साइबर धोखाधड़ी":
@@ -317,41 +402,163 @@ def extract_score(text):
                 score += int(crore_value) * 20
     return score
 
+def mentions_crime(text):
+    """True if text contains any crime keyword (line breaks count as spaces)."""
+    return vocabulary.find(" ".join(text.split())).any("screening")
+
 def extract_crime_category(text):
-    for police_crime_keyword in crimes_by_police:
-        if police_crime_keyword in text:
-            return "Crime by Police"
-    for public_crime_keyword in crime_type:
-        if public_crime_keyword in text:
-            return "Crime by Public"
+    hits = find_keywords(text)
+    if hits.any("crimes_by_police"):
+        return "Crime by Police"
+    if hits.any("crime_type"):
+        return "Crime by Public"
     return "Other"
 
-def extract_summary_string(text):
-    heading = f"🗞️ {extract_district(text)},  {extract_police_station(text)}___{extract_date(text)}___प्राथमिकी संख्या {extract_fir_number(text)}"
-    summary = (
-        f"{extract_accused(text)} को {extract_crime_type(text)} के मामले में आरोपी बनाया गया है। "
-        f"इस प्रकरण में शिकायतकर्ता का नाम {extract_complainant(text)} है। "
-    )
-    return heading, summary
-
-def analyze_articles(article_list):
-    all_info_2d_list = []
-    for news in article_list:
-        heading, summary = extract_summary_string(news)
-        crime_category = extract_crime_category(news)
-        info_row = [
-            extract_police_station(news),
-            extract_district(news),
-            extract_date(news),
-            extract_fir_number(news),
-            extract_complainant(news),
-            extract_accused(news),
-            extract_weapons(news),
-            extract_crime_type(news),
-            extract_score(news),
-            heading,
-            summary,
-            crime_category
+@dataclass
+class ArticleFeatures:
+    """Everything extracted from one article, each field computed once."""
+    police_station: str
+    district: str
+    date: str
+    fir_number: str
+    complainant: str
+    accused: str
+    weapons: str
+    crime_type: str
+    score: int
+    crime_category: str
+
+    @property
+    def heading(self):
+        return f"🗞️ {self.district},  {self.police_station}___{self.date}___प्राथमिकी संख्या {self.fir_number}"
+
+    @property
+    def summary(self):
+        return (
+            f"{self.accused} को {self.crime_type} के मामले में आरोपी बनाया गया है। "
+            f"इस प्रकरण में शिकायतकर्ता का नाम {self.complainant} है। "
+        )
+
+    def to_row(self):
+        """The analyze_articles row: the fields, then heading and summary, then the category."""
+        return [
+            self.police_station,
+            self.district,
+            self.date,
+            self.fir_number,
+            self.complainant,
+            self.accused,
+            self.weapons,
+            self.crime_type,
+            self.score,
+            self.heading,
+            self.summary,
+            self.crime_category
         ]
-        all_info_2d_list.append(info_row)
-    return all_info_2d_list
+
+
+def extract_article_features(text, ner_results=None):
+    crime = extract_crime_type(text)
+    return ArticleFeatures(
+        police_station=extract_police_station(text),
+        district=extract_district(text),
+        date=extract_date(text),
+        fir_number=extract_fir_number(text),
+        complainant=extract_complainant(text),
+        accused=extract_accused(text, ner_results),
+        weapons=extract_weapons(text),
+        crime_type=crime,
+        score=extract_score(text, crime),
+        crime_category=extract_crime_category(text)
+    )
+
+def extract_summary_string(text):
+    features = extract_article_features(text)
+    return features.heading, features.summary
+
+# ---------------- PARALLEL ANALYSIS ---------------- #
+# analyze_articles(..., parallel=True) splits large batches (the FIR texts of
+# a report window) into chunks and runs them on a process pool. Workers are
+# spawned, never forked from the threaded server, and import this module in
+# the pool initializer, so the vocabularies and matchers are built once per
+# worker instead of being pickled with every chunk. Batches smaller than
+# ANALYZE_PARALLEL_MIN stay serial; ANALYZE_PARALLEL=0 turns the pool off.
+# Workers build their NER backend from NER_BACKEND, so while a backend
+# installed with set_ner_backend is active the batch is analysed serially
+# and tagged by that backend like any other call. Repeated texts are
+# analysed once. Each chunk also returns the worker's NER cache hits and
+# misses, which /ner-cache/stats reports under "workers".
+ANALYZE_PARALLEL = os.getenv("ANALYZE_PARALLEL", "1") == "1"
+ANALYZE_WORKERS = int(os.getenv("ANALYZE_WORKERS", str(min(4, os.cpu_count() or 1))))
+ANALYZE_CHUNK_SIZE = int(os.getenv("ANALYZE_CHUNK_SIZE", "50"))
+ANALYZE_PARALLEL_MIN = int(os.getenv("ANALYZE_PARALLEL_MIN", "200"))
+
+_analyze_pool = None
+_analyze_pool_lock = threading.Lock()
+
+
+def _init_analyze_worker():
+    # Importing the module builds the vocabularies, automata and district
+    # resolver; done here once, chunks then only carry their texts.
+    import app.services.keyword_extractor  # noqa: F401
+
+
+def _analyze_chunk(articles):
+    # Articles whose accused isn't named by a pattern go to NER together
+    untagged = list(dict.fromkeys(news for news in articles if accused_from_patterns(news) is None))
+    entities = dict(zip(untagged, extract_entities_with_ner_batch(untagged))) if untagged else {}
+    return [extract_article_features(news, entities.get(news)).to_row() for news in articles]
+
+
+def _analyze_chunk_in_worker(articles):
+    before = ner_memory_counts()
+    rows = _analyze_chunk(articles)
+    after = ner_memory_counts()
+    return rows, {name: after[name] - before[name] for name in after}
+
+
+def get_analyze_pool() -> ProcessPoolExecutor:
+    global _analyze_pool
+    with _analyze_pool_lock:
+        if _analyze_pool is None:
+            _analyze_pool = ProcessPoolExecutor(
+                max_workers=ANALYZE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_analyze_worker
+            )
+    return _analyze_pool
+
+
+def _reset_analyze_pool():
+    global _analyze_pool
+    with _analyze_pool_lock:
+        if _analyze_pool is not None:
+            _analyze_pool.shutdown(wait=False, cancel_futures=True)
+        _analyze_pool = None
+
+
+def analyze_articles(article_list, parallel=False):
+    """
+    One 12-column row per article (see ArticleFeatures.to_row), in input
+    order. parallel=True uses the process pool for large batches.
+    """
+    article_list = list(article_list)
+    unique = list(dict.fromkeys(article_list))
+    if (not (parallel and ANALYZE_PARALLEL and ANALYZE_WORKERS > 1 and len(unique) >= ANALYZE_PARALLEL_MIN)
+            or ner_backend_installed()):
+        rows = _analyze_chunk(unique)
+    else:
+        chunks = [unique[i:i + ANALYZE_CHUNK_SIZE] for i in range(0, len(unique), ANALYZE_CHUNK_SIZE)]
+        try:
+            # map() yields in submission order, so rows line up with unique
+            rows = []
+            for chunk_rows, counts in get_analyze_pool().map(_analyze_chunk_in_worker, chunks):
+                rows.extend(chunk_rows)
+                add_worker_ner_counts(counts)
+        except BrokenProcessPool as e:
+            print(f"Analyze pool failed ({e}), analysing serially")
+            _reset_analyze_pool()
+            rows = _analyze_chunk(unique)
+
+    by_text = dict(zip(unique, rows))
+    return [list(by_text[news]) for news in article_list]
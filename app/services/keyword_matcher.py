@@ -0,0 +1,133 @@
+from collections import deque
+
+try:
+    import ahocorasick
+except ImportError:  # pure-Python automaton below
+    ahocorasick = None
+
+
+class _PyAutomaton:
+    """Plain-Python Aho-Corasick automaton, used when pyahocorasick isn't installed."""
+
+    def __init__(self, keywords):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for keyword in keywords:
+            state = 0
+            for ch in keyword:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state].append(keyword)
+
+        # Breadth first, so every fail target is finished before it is used
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, nxt in self._goto[state].items():
+                pending.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter(self, text):
+        """(end index, keyword) for every occurrence, like ahocorasick.Automaton.iter."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for keyword in out[state]:
+                yield i, keyword
+
+
+def build_automaton(keywords):
+    if ahocorasick is None:
+        return _PyAutomaton(keywords)
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+def is_word_char(ch) -> bool:
+    """Python re's \\w for str patterns: str.isalnum() or underscore."""
+    return ch.isalnum() or ch == "_"
+
+
+def word_bounded(text, start: int, end: int) -> bool:
+    """Same answer as a \\b...\\b regex matching text[start:end] in place."""
+    def boundary(i):
+        before = i > 0 and is_word_char(text[i - 1])
+        after = i < len(text) and is_word_char(text[i])
+        return before != after
+    return boundary(start) and boundary(end)
+
+
+class KeywordHits:
+    """Every vocabulary hit in one text: keyword -> start positions, ascending."""
+
+    def __init__(self, matcher, positions: dict):
+        self._matcher = matcher
+        self.positions = positions
+
+    def __contains__(self, keyword) -> bool:
+        return keyword in self.positions
+
+    def first(self, keyword) -> int:
+        """Start of the first occurrence, -1 if none (like str.find)."""
+        starts = self.positions.get(keyword)
+        return starts[0] if starts else -1
+
+    def occurs_within(self, keyword, start: int, end: int) -> bool:
+        """Same answer as keyword in text[start:end]."""
+        return any(start <= p and p + len(keyword) <= end for p in self.positions.get(keyword, ()))
+
+    def found(self, category: str):
+        """Keywords of a category that occur, in vocabulary order (duplicates kept)."""
+        return [keyword for keyword in self._matcher.vocabularies[category] if keyword in self.positions]
+
+    def any(self, category: str) -> bool:
+        return any(keyword in self.positions for keyword in self._matcher.vocabularies[category])
+
+    def matches(self):
+        """(start, keyword, categories) for every occurrence, in text order."""
+        return sorted(
+            (start, keyword, self._matcher.categories[keyword])
+            for keyword, starts in self.positions.items()
+            for start in starts
+        )
+
+
+class KeywordMatcher:
+    """
+    Finds every keyword of several named vocabularies in one pass over a
+    text (Aho-Corasick), instead of one substring scan per keyword. Plain
+    substring semantics: a hit here is exactly a keyword `in` text.
+    """
+
+    def __init__(self, vocabularies: dict):
+        self.vocabularies = {category: list(keywords) for category, keywords in vocabularies.items()}
+        self.categories = {}
+        for category, keywords in self.vocabularies.items():
+            for keyword in keywords:
+                if keyword:
+                    self.categories.setdefault(keyword, set()).add(category)
+        self._automaton = build_automaton(sorted(self.categories))
+
+    def find(self, text: str) -> KeywordHits:
+        positions = {}
+        if text:
+            for end, keyword in self._automaton.iter(text):
+                positions.setdefault(keyword, []).append(end - len(keyword) + 1)
+        return KeywordHits(self, positions)
@@ -0,0 +1,71 @@
+import re
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Metrics are per process; with several uvicorn workers, scrape each one
+# (or run a single worker behind the scraper).
+
+OCR_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+OCR_STAGE_SECONDS = Histogram(
+    "ocr_stage_seconds", "Time spent in one OCR preprocessing stage",
+    ["stage"], buckets=OCR_BUCKETS
+)
+OCR_PASS_SECONDS = Histogram(
+    "ocr_tesseract_pass_seconds", "Time spent in one Tesseract pass",
+    ["psm"], buckets=OCR_BUCKETS
+)
+OCR_PAGE_SECONDS = Histogram(
+    "ocr_page_seconds", "End-to-end OCR time for one image (cache misses only)",
+    ["profile"], buckets=OCR_BUCKETS
+)
+OCR_CACHE_LOOKUPS = Counter(
+    "ocr_cache_lookups_total", "OCR result cache lookups", ["result"]
+)
+OCR_IN_PROGRESS = Gauge(
+    "ocr_pages_in_progress", "Images currently being OCR'd"
+)
+JOB_QUEUE_DEPTH = Gauge(
+    "job_queue_depth", "Jobs waiting for a worker"
+)
+JOBS_IN_FLIGHT = Gauge(
+    "jobs_in_flight", "Jobs currently running"
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_seconds", "MySQL statement latency", ["statement"]
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency per endpoint",
+    ["method", "route", "status"], buckets=OCR_BUCKETS
+)
+
+_STATEMENT_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|EXISTS)\s+`?(\w+)", re.IGNORECASE)
+
+
+def observe_ocr_stage(stage: str, seconds: float):
+    """Stage names come from StageMeter: "main.denoise", "ocr.psm3", "fallback.ocr", "cascade.ocr", ..."""
+    if stage.startswith("ocr.psm"):
+        OCR_PASS_SECONDS.labels(psm=stage[len("ocr.psm"):]).observe(seconds)
+    elif stage in ("fallback.ocr", "cascade.ocr"):
+        OCR_PASS_SECONDS.labels(psm=stage.split(".")[0]).observe(seconds)
+    else:
+        OCR_STAGE_SECONDS.labels(stage=stage).observe(seconds)
+
+
+def statement_label(query: str) -> str:
+    """Label such as "SELECT t_news_upload": verb plus first table, never the literals."""
+    words = query.split(None, 1)
+    verb = words[0].upper() if words else "?"
+    table = _STATEMENT_TABLE.search(query)
+    return f"{verb} {table.group(1)}" if table else verb
+
+
+def track_job_queue(job_queue):
+    """Read queue depth and running jobs from job_queue at scrape time."""
+    JOB_QUEUE_DEPTH.set_function(lambda: job_queue.stats()["queued"])
+    JOBS_IN_FLIGHT.set_function(lambda: job_queue.stats()["running"])
+
+
+def render_latest():
+    """(body, content type) for the /metrics endpoint."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,353 @@
+import os
+import re
+import threading
+
+from dotenv import load_dotenv
+
+from app.services.result_cache import CACHE_DIR, MemoryLruCache, SqliteResultCache, content_key
+
+load_dotenv()
+
+# ---------------- NER BACKENDS ---------------- #
+# NER_BACKEND=auto   local model if NER_MODEL_PATH is set, else the rule tagger
+# NER_BACKEND=rules  offline Devanagari person-name tagger (cues + gazetteer)
+# NER_BACKEND=local  transformers token-classification model from NER_MODEL_PATH
+# NER_BACKEND=remote HuggingFace Inference API (needs HUGGINGFACE_TOKEN), the old behaviour
+#
+# Every backend tags a batch of texts in one call and returns, per text, a
+# list of entities shaped like the aggregated token_classification output:
+# {"entity_group": "PER", "word": ..., "start": ..., "end": ..., "score": ...}.
+NER_BACKEND = os.getenv("NER_BACKEND", "auto").lower()
+NER_MODEL_PATH = os.getenv("NER_MODEL_PATH")
+NER_REMOTE_MODEL = os.getenv("NER_REMOTE_MODEL", "ai4bharat/IndicNER")
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "16"))
+
+
+class NerBackend:
+    name = "base"
+
+    def config(self) -> dict:
+        """What the output depends on besides the text; part of the cache key."""
+        return {"backend": self.name}
+
+    def tag_batch(self, texts) -> list:
+        """One entity list per text, in input order (None where tagging failed)."""
+        raise NotImplementedError
+
+    def tag(self, text) -> list:
+        return self.tag_batch([text])[0]
+
+
+# Words that introduce a person: roles in FIR/news text and honorifics
+PERSON_CUES = [
+    "आरोपी", "आरोपियों", "अभियुक्त", "प्रार्थी", "प्रार्थिया", "शिकायतकर्ता", "फरियादी", "मृतक", "मृतका",
+    "पीड़ित", "पीड़िता", "गवाह", "चालक", "श्री", "श्रीमती", "सुश्री", "कुमारी", "डॉ", "स्व",
+]
+# Words that follow a name: kinship and age/address in "<name> पिता <name> उम्र 30 वर्ष"
+AFTER_NAME_CUES = ["पिता", "पुत्र", "पुत्री", "पति", "पत्नी", "उम्र", "आयु", "निवासी", "साकिन"]
+# Common surnames (Chhattisgarh and Hindi-belt), enough to anchor a name without a cue
+SURNAMES = [
+    "कुमार", "सिंह", "यादव", "साहू", "वर्मा", "शर्मा", "पटेल", "ठाकुर", "गुप्ता", "मिश्रा", "तिवारी", "दुबे",
+    "पांडे", "पाण्डेय", "पांडेय", "शुक्ला", "चौबे", "त्रिपाठी", "अग्रवाल", "जायसवाल", "सोनी", "देवांगन",
+    "निषाद", "ध्रुव", "नेताम", "मरकाम", "मंडावी", "कश्यप", "कुर्रे", "टंडन", "बघेल", "चंद्राकर", "श्रीवास",
+    "रात्रे", "बंजारे", "पैकरा", "कंवर", "राठौर", "राठौड़", "सेन", "नायक", "लहरे", "भारद्वाज", "खान",
+    "कुजूर", "तिर्की", "एक्का", "मिंज", "लकड़ा", "उइके", "पोर्ते", "सोरी", "कोर्राम", "गोंड", "रजक",
+    "मानिकपुरी", "जांगड़े", "खुंटे", "सिदार", "राजपूत", "चौहान", "दास", "महंत", "अहिरवार", "बंसल",
+]
+# Never part of a name: postpositions, verbs and place/police words around names
+NAME_STOPWORDS = {
+    "को", "ने", "के", "की", "का", "से", "में", "पर", "और", "एवं", "तथा", "द्वारा", "है", "हैं", "था", "थी", "थे",
+    "वर्ष", "साल", "ग्राम", "थाना", "जिला", "चौकी", "पुलिस", "गिरफ्तार", "किया", "गया", "गई", "लिया",
+    "नाम", "अपने", "उसके", "एक", "व", "या", "भी", "नहीं", "सहित", "बताया", "अज्ञात",
+}
+
+PERSON_CUE_SET = set(PERSON_CUES)
+AFTER_NAME_CUE_SET = set(AFTER_NAME_CUES)
+SURNAME_SET = set(SURNAMES)
+MAX_NAME_TOKENS = 3
+
+# Devanagari letters and signs, without the danda (।॥) and the digits; a
+# trailing "." stays on the token (डॉ., स्व., or the end of a sentence)
+_DEVANAGARI_TOKEN = re.compile(r"[\u0900-\u0963\u0970-\u097F]+\.?")
+
+
+class RuleNerBackend(NerBackend):
+    """
+    Offline person tagger for Devanagari text. A name is a run of up to
+    three adjacent words (only spaces between them) that follows a role or
+    honorific cue (आरोपी, श्री, ...), precedes a kinship/age cue (पिता,
+    उम्र, ...) or ends in a known surname. Only PER entities are produced.
+    """
+    name = "rules"
+
+    def config(self) -> dict:
+        word_lists = [PERSON_CUES, AFTER_NAME_CUES, SURNAMES, sorted(NAME_STOPWORDS), MAX_NAME_TOKENS]
+        return {"backend": self.name, "rules": content_key(b"", word_lists)}
+
+    def tag_batch(self, texts) -> list:
+        return [self._tag(text or "") for text in texts]
+
+    @staticmethod
+    def _is_name_word(word) -> bool:
+        word = word.rstrip(".")
+        return bool(word) and word not in NAME_STOPWORDS and word not in PERSON_CUE_SET \
+            and word not in AFTER_NAME_CUE_SET
+
+    def _tag(self, text) -> list:
+        tokens = [(m.start(), m.end(), m.group()) for m in _DEVANAGARI_TOKEN.finditer(text)]
+
+        def adjacent(i, j):
+            # Tokens i < j belong to one name only if whitespace separates
+            # them and i doesn't end a sentence (abbreviated cues aside)
+            word = tokens[i][2]
+            if word.endswith(".") and word.rstrip(".") not in PERSON_CUE_SET:
+                return False
+            return text[tokens[i][1]:tokens[j][0]].isspace()
+
+        def run_after(i):
+            end = i
+            while end + 1 < len(tokens) and end - i < MAX_NAME_TOKENS and adjacent(end, end + 1) \
+                    and self._is_name_word(tokens[end + 1][2]):
+                end += 1
+            return (i + 1, end) if end > i else None
+
+        def run_before(i):
+            start = i
+            while start - 1 >= 0 and i - start < MAX_NAME_TOKENS and adjacent(start - 1, start) \
+                    and self._is_name_word(tokens[start - 1][2]):
+                start -= 1
+            return (start, i - 1) if start < i else None
+
+        spans = []
+        for i, (_, _, word) in enumerate(tokens):
+            word = word.rstrip(".")
+            if word in PERSON_CUE_SET:
+                span = run_after(i)
+                if span:
+                    spans.append((span, 0.9))
+            elif word in AFTER_NAME_CUE_SET:
+                span = run_before(i)
+                if span:
+                    spans.append((span, 0.85))
+            elif word in SURNAME_SET and i > 0 and adjacent(i - 1, i) and self._is_name_word(tokens[i - 1][2]):
+                # Without a cue, only "<given name> <surname>"
+                spans.append(((i - 1, i), 0.7))
+
+        # Overlapping spans are one person; keep the widest extent and best score
+        entities = []
+        for (first, last), score in sorted(spans):
+            start, end = tokens[first][0], tokens[last][0] + len(tokens[last][2].rstrip("."))
+            if entities and start < entities[-1]["end"]:
+                previous = entities[-1]
+                previous["end"] = max(previous["end"], end)
+                previous["score"] = max(previous["score"], score)
+                previous["word"] = text[previous["start"]:previous["end"]]
+                continue
+            entities.append({
+                "entity_group": "PER",
+                "word": text[start:end],
+                "start": start,
+                "end": end,
+                "score": score,
+            })
+        return entities
+
+
+class LocalModelNerBackend(NerBackend):
+    """
+    transformers token-classification pipeline loaded from NER_MODEL_PATH
+    (e.g. a downloaded ai4bharat/IndicNER). Batches run through the model
+    together, NER_BATCH_SIZE texts at a time.
+    """
+    name = "local"
+
+    def __init__(self, model_path: str = NER_MODEL_PATH, batch_size: int = NER_BATCH_SIZE):
+        from transformers import pipeline
+
+        if not model_path:
+            raise ValueError("NER_MODEL_PATH is not set")
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self._pipeline = pipeline("token-classification", model=model_path, aggregation_strategy="simple")
+        self._lock = threading.Lock()
+
+    def config(self) -> dict:
+        return {"backend": self.name, "model": self.model_path}
+
+    def tag_batch(self, texts) -> list:
+        texts = list(texts)
+        if not texts:
+            return []
+        with self._lock:
+            results = self._pipeline(texts, batch_size=self.batch_size)
+        return [
+            [dict(entity, score=float(entity["score"])) for entity in entities]
+            for entities in results
+        ]
+
+
+class RemoteNerBackend(NerBackend):
+    """HuggingFace Inference API: one HTTP round trip per text."""
+    name = "remote"
+
+    def __init__(self, token: str = None, model: str = NER_REMOTE_MODEL):
+        from huggingface_hub import InferenceClient
+
+        token = token or os.getenv("HUGGINGFACE_TOKEN")
+        if not token:
+            raise ValueError("HUGGINGFACE_TOKEN is not set")
+        self.model = model
+        self._client = InferenceClient(provider="hf-inference", api_key=token)
+
+    def config(self) -> dict:
+        return {"backend": self.name, "model": self.model}
+
+    def tag_batch(self, texts) -> list:
+        results = []
+        for text in texts:
+            try:
+                results.append([dict(entity) for entity in self._client.token_classification(text, model=self.model)])
+            except Exception as e:
+                print(f"NER inference error: {e}")
+                results.append(None)
+        return results
+
+
+_ner_backend = None
+_ner_backend_installed = False
+_ner_backend_lock = threading.Lock()
+
+
+def get_ner_backend() -> NerBackend:
+    global _ner_backend
+    with _ner_backend_lock:
+        if _ner_backend is None:
+            if NER_BACKEND == "remote":
+                _ner_backend = RemoteNerBackend()
+            elif NER_BACKEND == "local" or (NER_BACKEND == "auto" and NER_MODEL_PATH):
+                try:
+                    _ner_backend = LocalModelNerBackend()
+                except Exception as e:
+                    if NER_BACKEND == "local":
+                        raise
+                    print("[NER] local model unavailable, using the rule tagger:", e)
+            if _ner_backend is None:
+                _ner_backend = RuleNerBackend()
+    return _ner_backend
+
+
+def set_ner_backend(backend: NerBackend):
+    """Swap the backend (e.g. a stand-in in tests); None re-reads NER_BACKEND."""
+    global _ner_backend, _ner_backend_installed
+    with _ner_backend_lock:
+        _ner_backend = backend
+        _ner_backend_installed = backend is not None
+
+
+def ner_backend_installed() -> bool:
+    """True while a backend set with set_ner_backend is active (other processes don't have it)."""
+    return _ner_backend_installed
+
+
+# ---------------- NER RESULT CACHE ---------------- #
+# The same FIR is tagged again by every report whose window covers it, so
+# results are cached by sha256(backend config + whitespace-normalised
+# text): first in memory (LRU, NER_CACHE_MAX_MEMORY_BYTES), then optionally
+# in SQLite (NER_CACHE_DISK=1), which survives restarts and is shared by
+# processes. Both tiers expire entries after NER_CACHE_TTL seconds. Texts
+# are tagged in normalised form, so entity offsets refer to that form.
+# The disk tier pays off for the local and remote models; the rule tagger
+# is about as fast as an SQLite lookup. Analysis pool workers have their
+# own memory tiers; their hit/miss counts come back with each chunk and are
+# summed here (add_worker_ner_counts) for /ner-cache/stats.
+NER_CACHE_ENABLED = os.getenv("NER_CACHE", "1") == "1"
+NER_CACHE_TTL = float(os.getenv("NER_CACHE_TTL", str(7 * 24 * 3600)))
+NER_CACHE_MAX_MEMORY_BYTES = int(os.getenv("NER_CACHE_MAX_MEMORY_BYTES", str(32 * 1024 * 1024)))
+NER_CACHE_DISK = os.getenv("NER_CACHE_DISK", "0") == "1"
+NER_CACHE_PATH = os.getenv("NER_CACHE_PATH", str(CACHE_DIR / "ner_results.sqlite3"))
+NER_CACHE_MAX_BYTES = int(os.getenv("NER_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+_ner_memory_cache = None
+_ner_disk_cache = None
+_ner_cache_lock = threading.Lock()
+_ner_worker_counts = {"hits": 0, "misses": 0}
+
+
+def get_ner_caches():
+    """(memory tier, disk tier); either is None when disabled."""
+    global _ner_memory_cache, _ner_disk_cache
+    if not NER_CACHE_ENABLED:
+        return None, None
+    with _ner_cache_lock:
+        if _ner_memory_cache is None:
+            _ner_memory_cache = MemoryLruCache(NER_CACHE_MAX_MEMORY_BYTES, NER_CACHE_TTL)
+        if NER_CACHE_DISK and _ner_disk_cache is None:
+            _ner_disk_cache = SqliteResultCache(NER_CACHE_PATH, NER_CACHE_MAX_BYTES)
+    return _ner_memory_cache, _ner_disk_cache
+
+
+def ner_memory_counts() -> dict:
+    """Hit/miss counters of this process's memory tier."""
+    memory, _ = get_ner_caches()
+    stats = memory.stats() if memory else {}
+    return {name: stats.get(name, 0) for name in _ner_worker_counts}
+
+
+def add_worker_ner_counts(counts: dict):
+    """Add memory-tier lookups made in an analysis pool worker to the server's totals."""
+    with _ner_cache_lock:
+        for name in _ner_worker_counts:
+            _ner_worker_counts[name] += counts.get(name, 0)
+
+
+def ner_cache_stats() -> dict:
+    memory, disk = get_ner_caches()
+    if memory is None:
+        return {"enabled": False}
+    with _ner_cache_lock:
+        workers = dict(_ner_worker_counts)
+    lookups = workers["hits"] + workers["misses"]
+    return {
+        "memory": memory.stats(),
+        "workers": dict(workers, hit_rate=round(workers["hits"] / lookups, 4) if lookups else 0.0),
+        "disk": disk.stats() if disk else {"enabled": False},
+    }
+
+
+def normalize_ner_text(text) -> str:
+    return " ".join((text or "").split())
+
+
+def tag_texts(texts) -> list:
+    """Entity lists for texts, tagged by the configured backend through the NER cache."""
+    backend = get_ner_backend()
+    memory, disk = get_ner_caches()
+    texts = [normalize_ner_text(text) for text in texts]
+    config = backend.config()
+    keys = [content_key(text.encode("utf-8"), config) for text in texts]
+
+    results = [None] * len(texts)
+    pending = {}
+    for i, key in enumerate(keys):
+        if memory is not None:
+            results[i] = memory.get(key)
+        if results[i] is None and disk is not None:
+            results[i] = disk.get(key, max_age=NER_CACHE_TTL)
+            if results[i] is not None:
+                memory.put(key, results[i])
+        if results[i] is None:
+            # Duplicates within the batch are tagged once
+            pending.setdefault(key, []).append(i)
+
+    if pending:
+        indexes = list(pending.values())
+        tagged = backend.tag_batch([texts[group[0]] for group in indexes])
+        for key, group, entities in zip(pending, indexes, tagged):
+            if entities is not None:
+                if memory is not None:
+                    memory.put(key, entities)
+                if disk is not None:
+                    disk.put(key, entities)
+            for i in group:
+                results[i] = entities if entities is not None else []
+    return results
@@ -2,16 +2,229 @@ import pytesseract
 import cv2
 import numpy as np
 import base64
-import tempfile
 import re
 import io
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 
-# ---------------- TESSERACT SETUP ---------------- #
-try:
-    pytesseract.get_tesseract_version()
-except:
-    pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+from app.services import metrics
+from app.services.result_cache import CACHE_DIR, BinaryArrayCache, SqliteResultCache, content_key
+
+# ---------------- CONCURRENCY SETUP ---------------- #
+# Run the PSM passes and the fallback pass on a bounded worker pool.
+# OCR_CONCURRENT=0 restores the old one-after-another behaviour.
+OCR_CONCURRENT = os.getenv("OCR_CONCURRENT", "1") == "1"
+OCR_MAX_WORKERS = int(os.getenv("OCR_MAX_WORKERS", str(min(5, os.cpu_count() or 1))))
+
+PSM_MODES = [1, 3, 4, 6]
+OCR_LANG = 'hin+eng'   # 🔥 THIS IS THE KEY
+
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+
+def _limit_omp_threads():
+    # Give every worker a fair share of the cores so parallel tesseract
+    # engines don't each spin up one OpenMP thread per core. Must run
+    # before libtesseract is loaded to take effect for in-process engines.
+    if OCR_CONCURRENT:
+        omp_share = max(1, (os.cpu_count() or 1) // OCR_MAX_WORKERS)
+        os.environ.setdefault("OMP_THREAD_LIMIT", str(omp_share))
+
+
+def get_ocr_pool() -> ThreadPoolExecutor:
+    """Shared pool for Tesseract passes (the engines release the GIL)."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _limit_omp_threads()
+            _ocr_pool = ThreadPoolExecutor(
+                max_workers=OCR_MAX_WORKERS,
+                thread_name_prefix="ocr"
+            )
+    return _ocr_pool
+
+
+# ---------------- OCR BACKENDS ---------------- #
+# OCR_BACKEND=auto      warm tesserocr engines if installed, else pytesseract
+# OCR_BACKEND=tesserocr always use the in-process engine pool
+# OCR_BACKEND=pytesseract one tesseract subprocess per call (old behaviour)
+OCR_BACKEND = os.getenv("OCR_BACKEND", "auto").lower()
+
+
+WORD_COLUMNS = ("text", "conf", "left", "top", "width", "height", "block_num", "par_num", "line_num")
+
+
+class OcrBackend:
+    name = "base"
+    version = None
+
+    def image_to_string(self, image, psm: int, lang: str = OCR_LANG) -> str:
+        raise NotImplementedError
+
+    def image_to_data(self, image, psm: int, lang: str = OCR_LANG) -> dict:
+        """Recognised words as columns (see WORD_COLUMNS), one entry per word."""
+        raise NotImplementedError
+
+
+class PytesseractBackend(OcrBackend):
+    """Forks a tesseract process per call; always available as the fallback."""
+    name = "pytesseract"
+
+    def __init__(self):
+        try:
+            self.version = pytesseract.get_tesseract_version()
+        except Exception:
+            pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+            try:
+                self.version = pytesseract.get_tesseract_version()
+            except Exception as e:
+                print("[OCR WARNING] tesseract binary not found:", e)
+
+    def image_to_string(self, image, psm: int, lang: str = OCR_LANG) -> str:
+        return pytesseract.image_to_string(
+            image,
+            config=f'--oem 3 --psm {psm}',
+            lang=lang
+        )
+
+    def image_to_data(self, image, psm: int, lang: str = OCR_LANG) -> dict:
+        data = pytesseract.image_to_data(
+            image,
+            config=f'--oem 3 --psm {psm}',
+            lang=lang,
+            output_type=pytesseract.Output.DICT
+        )
+        words = {column: [] for column in WORD_COLUMNS}
+        for i, level in enumerate(data["level"]):
+            conf = float(data["conf"][i])
+            if level != 5 or conf < 0 or not data["text"][i].strip():
+                continue
+            for column in WORD_COLUMNS:
+                words[column].append(conf if column == "conf" else data[column][i])
+        return words
+
+
+class TesserocrBackend(OcrBackend):
+    """
+    Pool of long-lived in-process Tesseract engines (C API via tesserocr).
+    Each engine keeps its traineddata loaded, so a pass costs only the
+    recognition itself instead of a process spawn plus a model load.
+    """
+    name = "tesserocr"
+
+    def __init__(self, pool_size: int = OCR_MAX_WORKERS, warm_langs=None):
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        self.version = tesserocr.tesseract_version()
+        self.pool_size = pool_size
+        self._idle = {}
+        self._created = {}
+        self._lock = threading.Lock()
+
+        # Load the models now, not on the first request: the ones script
+        # detection picks, or OCR_LANG when it is off
+        if warm_langs is None:
+            warm_langs = [OCR_LANG] if OCR_SCRIPT_DETECT == "off" else sorted(set(SCRIPT_LANGS.values()))
+        for lang in warm_langs:
+            self._release(lang, self._acquire(lang))
+
+    def _acquire(self, lang: str):
+        with self._lock:
+            idle = self._idle.setdefault(lang, queue.LifoQueue())
+            try:
+                return idle.get_nowait()
+            except queue.Empty:
+                pass
+            if self._created.get(lang, 0) < self.pool_size:
+                self._created[lang] = self._created.get(lang, 0) + 1
+                create = True
+            else:
+                create = False
+
+        if not create:
+            return idle.get()
+        try:
+            return self._tesserocr.PyTessBaseAPI(
+                lang=lang,
+                oem=self._tesserocr.OEM.DEFAULT
+            )
+        except Exception:
+            with self._lock:
+                self._created[lang] -= 1
+            raise
+
+    def _release(self, lang: str, api):
+        api.Clear()
+        self._idle[lang].put(api)
+
+    def image_to_string(self, image, psm: int, lang: str = OCR_LANG) -> str:
+        api = self._acquire(lang)
+        try:
+            api.SetPageSegMode(psm)
+            api.SetImage(Image.fromarray(image))
+            return api.GetUTF8Text()
+        finally:
+            self._release(lang, api)
+
+    def image_to_data(self, image, psm: int, lang: str = OCR_LANG) -> dict:
+        RIL = self._tesserocr.RIL
+        words = {column: [] for column in WORD_COLUMNS}
+        api = self._acquire(lang)
+        try:
+            api.SetPageSegMode(psm)
+            api.SetImage(Image.fromarray(image))
+            api.Recognize()
+
+            # Number blocks/paragraphs/lines the way tesseract's TSV does
+            block = par = line = 0
+            for word in self._tesserocr.iterate_level(api.GetIterator(), RIL.WORD):
+                if word.IsAtBeginningOf(RIL.BLOCK):
+                    block, par, line = block + 1, 0, 0
+                if word.IsAtBeginningOf(RIL.PARA):
+                    par, line = par + 1, 0
+                if word.IsAtBeginningOf(RIL.TEXTLINE):
+                    line += 1
+
+                text = word.GetUTF8Text(RIL.WORD)
+                if not text or not text.strip():
+                    continue
+                x1, y1, x2, y2 = word.BoundingBox(RIL.WORD)
+                for column, value in zip(
+                    WORD_COLUMNS,
+                    (text, word.Confidence(RIL.WORD), x1, y1, x2 - x1, y2 - y1, block, par, line)
+                ):
+                    words[column].append(value)
+        finally:
+            self._release(lang, api)
+        return words
+
+
+_ocr_backend = None
+_ocr_backend_lock = threading.Lock()
+
+
+def get_ocr_backend() -> OcrBackend:
+    global _ocr_backend
+    with _ocr_backend_lock:
+        if _ocr_backend is None:
+            _limit_omp_threads()
+            if OCR_BACKEND in ("auto", "tesserocr"):
+                try:
+                    _ocr_backend = TesserocrBackend()
+                except Exception as e:
+                    if OCR_BACKEND == "tesserocr":
+                        raise
+                    print("[OCR] tesserocr unavailable, using pytesseract:", e)
+            if _ocr_backend is None:
+                _ocr_backend = PytesseractBackend()
+    return _ocr_backend
 
 
 # ---------------- TEXT CLEANER ---------------- #
@@ -21,21 +234,124 @@ def clean_text(text: str) -> str:
     return text.strip()
 
 
+# ---------------- WORD-LEVEL OUTPUT ---------------- #
+# With profile["words"] set, Tesseract passes return word columns (see
+# WORD_COLUMNS) along with the text, so later re-extraction (locating a
+# name, re-splitting articles) never needs another OCR run. Text and words
+# travel together as an OcrText, so choosing the best pass keeps the
+# matching words. Boxes are mapped back to deskewed page pixels.
+OCR_WORDS = os.getenv("OCR_WORDS", "0") == "1"
+
+
+class OcrText(str):
+    """OCR'd text; .words holds its word columns when they were collected."""
+    words = None
+
+
+def with_words(text: str, words: dict) -> OcrText:
+    text = OcrText(text)
+    text.words = words
+    return text
+
+
+def empty_words() -> dict:
+    return {column: [] for column in WORD_COLUMNS}
+
+
+def transform_words(words: dict, fx: float = 1.0, fy: float = 1.0, dx: int = 0, dy: int = 0,
+                    keep=None) -> dict:
+    """Boxes scaled by (fx, fy), then shifted by (dx, dy); keep(word) -> bool filters."""
+    result = empty_words()
+    for i in range(len(words["text"])):
+        word = {column: words[column][i] for column in WORD_COLUMNS}
+        word["left"] = int(round(word["left"] * fx)) + dx
+        word["top"] = int(round(word["top"] * fy)) + dy
+        word["width"] = int(round(word["width"] * fx))
+        word["height"] = int(round(word["height"] * fy))
+        word["conf"] = round(float(word["conf"]), 2)
+        if keep is None or keep(word):
+            for column in WORD_COLUMNS:
+                result[column].append(word[column])
+    return result
+
+
+def words_to_image(text, binary, image):
+    """Map text.words (if any) from binary pixels to image pixels, in place."""
+    if getattr(text, "words", None) is not None:
+        text.words = transform_words(
+            text.words,
+            image.shape[1] / float(binary.shape[1]),
+            image.shape[0] / float(binary.shape[0])
+        )
+    return text
+
+
+def concat_words(parts) -> dict:
+    """Join word columns; block numbers are offset so blocks of different parts stay apart."""
+    result = empty_words()
+    offset = 0
+    for words in parts:
+        for column in WORD_COLUMNS:
+            values = words[column]
+            result[column].extend([v + offset for v in values] if column == "block_num" else values)
+        offset = max(result["block_num"], default=offset)
+    return result
+
+
 # ---------------- DESKEW IMAGE ---------------- #
-def deskew_image(image):
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    gray = cv2.bitwise_not(gray)
+# The skew angle is found with a projection profile on a downscaled copy:
+# text lines give the sharpest row histogram when they are level. Pages
+# already within the tolerance are returned untouched (no warp).
+DESKEW_MAX_SIDE = int(os.getenv("OCR_DESKEW_MAX_SIDE", "1000"))
+DESKEW_MAX_ANGLE = float(os.getenv("OCR_DESKEW_MAX_ANGLE", "5.0"))
+DESKEW_TOLERANCE = float(os.getenv("OCR_DESKEW_TOLERANCE", "0.3"))
+DESKEW_MAX_POINTS = 200000
 
-    thresh = cv2.threshold(
-        gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU
-    )[1]
 
-    coords = np.column_stack(np.where(thresh > 0))
-    if coords.size == 0:
-        return image
+def _projection_score(ys, xs, angle: float) -> float:
+    """Sharpness of the row histogram after rotating the points by angle."""
+    theta = np.deg2rad(angle)
+    rows = np.round(ys * np.cos(theta) - xs * np.sin(theta)).astype(np.int32)
+    counts = np.bincount(rows - rows.min()).astype(np.float64)
+    # Rounding blurs every rotated profile by about a pixel; blur all of them
+    # the same way or the unrotated one (exactly 0°) always wins
+    counts = np.convolve(counts, [1.0, 2.0, 1.0], mode="same")
+    return float(np.dot(counts, counts))
 
-    angle = cv2.minAreaRect(coords)[-1]
-    angle = -(90 + angle) if angle < -45 else -angle
+
+def estimate_skew_angle(image) -> float:
+    """
+    Rotation (degrees, cv2.getRotationMatrix2D convention) that levels the
+    text lines. Coarse 0.5° sweep over ±DESKEW_MAX_ANGLE, then 0.1° refine.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    factor = min(1.0, DESKEW_MAX_SIDE / float(max(gray.shape[:2])))
+    if factor < 1.0:
+        gray = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+
+    ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+    ys, xs = np.nonzero(ink)
+    if ys.size == 0:
+        return 0.0
+    if ys.size > DESKEW_MAX_POINTS:
+        step = ys.size // DESKEW_MAX_POINTS + 1
+        ys, xs = ys[::step], xs[::step]
+    ys = ys.astype(np.float32) - gray.shape[0] / 2.0
+    xs = xs.astype(np.float32) - gray.shape[1] / 2.0
+
+    def best(candidates):
+        return max(candidates, key=lambda angle: _projection_score(ys, xs, angle))
+
+    coarse = best(np.arange(-DESKEW_MAX_ANGLE, DESKEW_MAX_ANGLE + 0.25, 0.5))
+    fine = best(np.arange(coarse - 0.5, coarse + 0.55, 0.1))
+    return round(float(fine), 2) + 0.0  # no "-0.0" in metadata
+
+
+def deskew_with_angle(image, tolerance: float = DESKEW_TOLERANCE):
+    """Returns (deskewed image, angle). The input is returned as-is below tolerance."""
+    angle = estimate_skew_angle(image)
+    if abs(angle) < tolerance:
+        return image, angle
 
     (h, w) = image.shape[:2]
     center = (w // 2, h // 2)
@@ -45,111 +361,1376 @@ def deskew_image(image):
         image, M, (w, h),
         flags=cv2.INTER_CUBIC,
         borderMode=cv2.BORDER_REPLICATE
+    ), angle
+
+
+def deskew_image(image):
+    return deskew_with_angle(image)[0]
+
+
+# ---------------- SCALING & MEMORY BUDGET ---------------- #
+# The upscale factor follows the measured text height instead of a fixed
+# 2.5x, and the working image is capped so a large scan can't blow up the
+# grayscale/denoise buffers.
+OCR_TARGET_TEXT_HEIGHT = int(os.getenv("OCR_TARGET_TEXT_HEIGHT", "32"))
+OCR_MIN_SCALE = float(os.getenv("OCR_MIN_SCALE", "0.5"))
+OCR_MAX_SCALE = float(os.getenv("OCR_MAX_SCALE", "2.5"))
+OCR_MAX_WORKING_PIXELS = int(os.getenv("OCR_MAX_WORKING_PIXELS", str(16 * 1000 * 1000)))
+SCALE_ESTIMATE_MAX_SIDE = 1600
+
+
+class StageMeter:
+    """
+    Per-request bookkeeping: bytes of working arrays currently held (and
+    their peak), plus wall time spent in each named preprocessing stage.
+    """
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self.stage_ms = {}
+        self._lock = threading.Lock()
+
+    def hold(self, *arrays):
+        with self._lock:
+            self.current += sum(a.nbytes for a in arrays)
+            self.peak = max(self.peak, self.current)
+
+    def drop(self, *arrays):
+        with self._lock:
+            self.current -= sum(a.nbytes for a in arrays)
+
+    def record(self, stage: str, seconds: float):
+        # Block OCR runs a chain per block, so times add up per stage
+        with self._lock:
+            self.stage_ms[stage] = round(self.stage_ms.get(stage, 0.0) + seconds * 1000.0, 2)
+        metrics.observe_ocr_stage(stage, seconds)
+
+
+def estimate_text_height(image) -> float:
+    """Median glyph height in pixels, measured on a downscaled copy."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    factor = min(1.0, SCALE_ESTIMATE_MAX_SIDE / float(max(gray.shape[:2])))
+    if factor < 1.0:
+        gray = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+    ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+    return _estimate_text_height(ink) / factor
+
+
+def choose_scale(image, max_scale: float = OCR_MAX_SCALE,
+                 max_pixels: float = OCR_MAX_WORKING_PIXELS) -> float:
+    """Scale that brings text to OCR_TARGET_TEXT_HEIGHT, within the pixel budget (None: no budget)."""
+    scale = OCR_TARGET_TEXT_HEIGHT / max(1.0, estimate_text_height(image))
+    scale = min(max(scale, OCR_MIN_SCALE), max_scale)
+
+    if max_pixels:
+        h, w = image.shape[:2]
+        scale = min(scale, (max_pixels / float(h * w)) ** 0.5)
+    return round(scale, 3)
+
+
+def scaled_shape(shape, scale: float):
+    """(height, width) of an image of the given shape after resize_for_ocr."""
+    if scale == 1.0:
+        return shape[0], shape[1]
+    return max(1, int(shape[0] * scale)), max(1, int(shape[1] * scale))
+
+
+def resize_for_ocr(gray, scale: float):
+    if scale == 1.0:
+        return gray
+    height, width = scaled_shape(gray.shape, scale)
+    return cv2.resize(
+        gray,
+        (width, height),
+        interpolation=cv2.INTER_CUBIC if scale > 1.0 else cv2.INTER_AREA
     )
 
 
+def run_stages(image, stages, meter: StageMeter = None, chain: str = "main"):
+    """
+    Apply (name, fn) stages in order. Each intermediate is released as soon
+    as the next stage has consumed it, so at most two working buffers are
+    alive at a time. The caller's input array is never released here.
+    Stage times are recorded on the meter as "<chain>.<name>".
+    """
+    work = image
+    for name, stage in stages:
+        started = time.perf_counter()
+        result = stage(work)
+        if meter:
+            meter.record(f"{chain}.{name}", time.perf_counter() - started)
+            meter.hold(result)
+            if work is not image:
+                meter.drop(work)
+        work = result
+    return work
+
+
+# ---------------- LANGUAGE / SCRIPT DETECTION ---------------- #
+# Tesseract runs only the models the page needs. A hint (LANG_CD, the
+# upload's language field, or Tesseract codes) wins; without one the script
+# is detected on a central crop. Devanagari words hang from a continuous
+# headline (shirorekha), so long horizontal strokes make up a large share
+# of the ink; in Latin text they are almost absent.
+# OCR_SCRIPT_DETECT=pixels (default) | osd (Tesseract OSD) | off (OCR_LANG)
+OCR_SCRIPT_DETECT = os.getenv("OCR_SCRIPT_DETECT", "pixels")
+SCRIPT_DETECT_MAX_SIDE = 1000
+SHIROREKHA_DEVANAGARI_MIN = 0.08
+SHIROREKHA_LATIN_MAX = 0.02
+
+SCRIPT_LANGS = {"Devanagari": "hin", "Latin": "eng"}
+# CCTNS LANG_CD of the languages news is filed in (t_news_upload.LANG_CD)
+LANG_CODES = {"hin": 6, "eng": 99}
+LANG_HINTS = {
+    "hindi": "hin", "hi": "hin",
+    "english": "eng", "en": "eng",
+    **{str(code): lang for lang, code in LANG_CODES.items()},
+}
+_TESSERACT_LANGS = re.compile(r"[a-z]{3}(_[a-z]+)?(\+[a-z]{3}(_[a-z]+)?)*")
+
+_known_langs = None
+
+
+def known_languages() -> frozenset:
+    """Languages a hint may name: those Tesseract reports installed (asked once), else hin and eng."""
+    global _known_langs
+    if _known_langs is None:
+        try:
+            _known_langs = frozenset(pytesseract.get_languages(config=""))
+        except Exception as e:
+            print("[OCR WARNING] could not list Tesseract languages, accepting hin and eng only:", e)
+            _known_langs = frozenset(OCR_LANG.split("+")) | frozenset(SCRIPT_LANGS.values())
+    return _known_langs
+
+
+def resolve_lang_hint(hint):
+    """Tesseract lang string for a hint, or None when it says nothing usable."""
+    if hint is None:
+        return None
+    value = str(hint).strip().lower()
+    if value in LANG_HINTS:
+        return LANG_HINTS[value]
+    if not _TESSERACT_LANGS.fullmatch(value) or not set(value.split("+")) <= known_languages():
+        return None
+    return value
+
+
+def is_invalid_lang_hint(hint) -> bool:
+    """True for a hint that was given but isn't recognised (it would be ignored)."""
+    return hint is not None and bool(str(hint).strip()) and resolve_lang_hint(hint) is None
+
+
+def check_lang_hint(hint):
+    """resolve_lang_hint, but ValueError for an unrecognised hint (for request validation)."""
+    if is_invalid_lang_hint(hint):
+        raise ValueError(
+            f"Unknown language '{hint}'. Use Hindi, English, a LANG_CD (6, 99) or Tesseract codes such as "
+            f"hin+eng (installed: {', '.join(sorted(known_languages()))})"
+        )
+    return resolve_lang_hint(hint)
+
+
+def _script_crop(image):
+    """Central 60% of the page, downscaled: skips mastheads, ads in margins."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    h, w = gray.shape[:2]
+    gray = gray[h // 5:h - h // 5, w // 5:w - w // 5]
+    factor = min(1.0, SCRIPT_DETECT_MAX_SIDE / float(max(gray.shape[:2])))
+    if factor < 1.0:
+        gray = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+    return gray
+
+
+def shirorekha_ratio(image) -> float:
+    """Share of ink in horizontal strokes at least 1.5 text heights long."""
+    ink = cv2.threshold(_script_crop(image), 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+    total = int(np.count_nonzero(ink))
+    if not total:
+        return 0.0
+    length = max(3, int(_estimate_text_height(ink) * 1.5))
+    strokes = cv2.morphologyEx(ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (length, 1)))
+    return np.count_nonzero(strokes) / float(total)
+
+
+def detect_ocr_lang(image) -> str:
+    """Tesseract lang string for the page's script; OCR_LANG when unsure."""
+    if OCR_SCRIPT_DETECT == "osd":
+        try:
+            osd = pytesseract.image_to_osd(_script_crop(image), output_type=pytesseract.Output.DICT)
+            return SCRIPT_LANGS.get(osd.get("script"), OCR_LANG)
+        except Exception as e:
+            print("[OCR WARNING] OSD failed, using pixel statistics:", e)
+    elif OCR_SCRIPT_DETECT != "pixels":
+        return OCR_LANG
+
+    ratio = shirorekha_ratio(image)
+    if ratio >= SHIROREKHA_DEVANAGARI_MIN:
+        return SCRIPT_LANGS["Devanagari"]
+    if ratio <= SHIROREKHA_LATIN_MAX:
+        return SCRIPT_LANGS["Latin"]
+    return OCR_LANG
+
+
+# ---------------- PREPROCESSING PROFILES ---------------- #
+# Named trade-offs between latency and OCR quality. "quality" is the
+# original chain; "fast" swaps NL-means for a median blur and skips the
+# fallback chain, for interactive uploads that need quick feedback.
+PREPROCESS_PROFILES = {
+    "fast": {
+        "denoise": lambda gray: cv2.medianBlur(gray, 3),
+        "max_scale": 2.0,
+        "psm_modes": [3, 6],
+        "fallback": False,
+    },
+    "balanced": {
+        # Smaller NL-means search window: roughly a quarter of the work
+        "denoise": lambda gray: cv2.fastNlMeansDenoising(gray, None, 15, 7, 11),
+        "max_scale": OCR_MAX_SCALE,
+        "psm_modes": PSM_MODES,
+        "fallback": True,
+    },
+    "quality": {
+        "denoise": lambda gray: cv2.fastNlMeansDenoising(gray, None, 15, 7, 21),
+        "max_scale": OCR_MAX_SCALE,
+        "psm_modes": PSM_MODES,
+        "fallback": True,
+    },
+}
+OCR_PROFILE = os.getenv("OCR_PROFILE", "quality")
+
+
+def get_profile(name: str = None) -> dict:
+    """Profile settings by name (None means OCR_PROFILE); ValueError if unknown."""
+    name = name or OCR_PROFILE
+    if name not in PREPROCESS_PROFILES:
+        raise ValueError(f"Unknown OCR profile '{name}', expected one of {sorted(PREPROCESS_PROFILES)}")
+    return dict(PREPROCESS_PROFILES[name], name=name, lang=OCR_LANG, words=OCR_WORDS)
+
+
+# ---------------- PREPROCESSED BINARY CACHE ---------------- #
+# The binarized output of the main and fallback chains, keyed by a hash of
+# the input array (page, article block or tile) plus the chain, profile and
+# scale. Experiments with Tesseract settings, benchmarks and reprocessing
+# then skip upscale, denoise, CLAHE and threshold on pages seen before.
+# Entries are bit-packed .npy files (see BinaryArrayCache) that are memory
+# mapped on load. Hashing costs a few tens of ms per page and production
+# rarely sees a page twice (the result cache answers repeats), so it is off
+# by default: set OCR_BINARY_CACHE=1 for experiments and reprocessing runs,
+# benchmark_ocr.py turns it on with --reuse-binaries.
+OCR_BINARY_CACHE_ENABLED = os.getenv("OCR_BINARY_CACHE", "0") == "1"
+OCR_BINARY_CACHE_DIR = os.getenv("OCR_BINARY_CACHE_DIR", str(CACHE_DIR / "binaries"))
+OCR_BINARY_CACHE_MAX_BYTES = int(os.getenv("OCR_BINARY_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+_binary_cache = None
+_binary_cache_lock = threading.Lock()
+
+
+def get_binary_cache():
+    global _binary_cache
+    if not OCR_BINARY_CACHE_ENABLED:
+        return None
+    with _binary_cache_lock:
+        if _binary_cache is None:
+            _binary_cache = BinaryArrayCache(OCR_BINARY_CACHE_DIR, OCR_BINARY_CACHE_MAX_BYTES)
+    return _binary_cache
+
+
+def binary_cache_stats() -> dict:
+    cache = get_binary_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+def cached_binary(image, chain: str, scale: float, profile: dict, build, meter: StageMeter = None):
+    """build() -> binary, unless the binary cache already has it for this image."""
+    cache = get_binary_cache()
+    if cache is None:
+        return build()
+
+    started = time.perf_counter()
+    config = {
+        "pipeline": OCR_PIPELINE_VERSION,
+        "chain": chain,
+        # The fallback chain doesn't depend on the profile
+        "profile": profile["name"] if chain == "main" else None,
+        "scale": scale,
+        "shape": list(image.shape),
+    }
+    key = content_key(np.ascontiguousarray(image), config)
+    binary = cache.get(key, scaled_shape(image.shape, scale))
+    if meter:
+        meter.record(f"{chain}.binary_cache", time.perf_counter() - started)
+    if binary is not None:
+        if meter:
+            meter.hold(binary)
+        return binary
+
+    binary = build()
+    cache.put(key, binary)
+    return binary
+
+
 # ---------------- MAIN OCR (HINDI + ENGLISH) ---------------- #
-def extract_text_from_image(image_path: str) -> str:
+def preprocess_image(image, scale: float = None, meter: StageMeter = None, profile: dict = None):
+    profile = profile or get_profile()
+    # Scale up (VERY important for Hindi), but only as far as the text needs
+    if scale is None:
+        scale = choose_scale(image, profile["max_scale"])
+    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+    kernel = np.ones((2, 2), np.uint8)
+
+    stages = [
+        ("grayscale", lambda img: cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)),
+        ("resize", lambda gray: resize_for_ocr(gray, scale)),
+        # Noise reduction
+        ("denoise", profile["denoise"]),
+        # Contrast boost
+        ("clahe", clahe.apply),
+        # Adaptive threshold (best for newspapers)
+        ("threshold", lambda gray: cv2.adaptiveThreshold(
+            gray, 255,
+            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            cv2.THRESH_BINARY,
+            31, 11
+        )),
+        # Morphology (safe for Hindi + English)
+        ("morphology", lambda binary: cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel)),
+    ]
+    return cached_binary(image, "main", scale, profile, lambda: run_stages(image, stages, meter), meter)
+
+
+def run_psm_pass(binary, psm: int, meter: StageMeter = None, lang: str = OCR_LANG, words: bool = False) -> str:
+    """One Tesseract pass; with words, an OcrText rebuilt from the word columns."""
+    started = time.perf_counter()
+    if words:
+        data = get_ocr_backend().image_to_data(binary, psm, lang)
+        text = with_words(text_from_words(data), data)
+    else:
+        text = clean_text(get_ocr_backend().image_to_string(binary, psm, lang))
+    if meter:
+        meter.record(f"ocr.psm{psm}", time.perf_counter() - started)
+    return text
+
+
+def submit_psm_passes(binary, pool, psm_modes=PSM_MODES, meter: StageMeter = None, lang: str = OCR_LANG,
+                      words: bool = False):
+    # Futures are kept in PSM order so ties resolve exactly like the serial loop
+    return [pool.submit(run_psm_pass, binary, psm, meter, lang, words) for psm in psm_modes]
+
+
+def select_best_text(results) -> str:
+    # Pick best result
+    return max(results, key=lambda t: (len(t), t.count("\n")))
+
+
+def extract_text_from_array(image, concurrent: bool = None, scale: float = None,
+                            meter: StageMeter = None, profile: dict = None) -> str:
+    """Main OCR chain on an already deskewed BGR array."""
+    profile = profile or get_profile()
+    binary = preprocess_image(image, scale, meter, profile)
+
+    if OCR_CONCURRENT if concurrent is None else concurrent:
+        futures = submit_psm_passes(
+            binary, get_ocr_pool(), profile["psm_modes"], meter, profile["lang"], profile["words"]
+        )
+        text = select_best_text([f.result() for f in futures])
+    else:
+        # Try multiple page segmentation modes
+        text = select_best_text([
+            run_psm_pass(binary, psm, meter, profile["lang"], profile["words"]) for psm in profile["psm_modes"]
+        ])
+
+    words_to_image(text, binary, image)
+    if meter:
+        meter.drop(binary)
+    return text
+
+
+def extract_text_from_image(image_path: str, concurrent: bool = None, profile: str = None) -> str:
     image = cv2.imread(image_path)
     if image is None:
         raise ValueError(f"Failed to load image: {image_path}")
 
     # Fix rotation
-    image = deskew_image(image)
-
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return extract_text_from_array(deskew_image(image), concurrent, profile=get_profile(profile))
 
-    # Scale up (VERY important for Hindi)
-    scale = 2.5
-    gray = cv2.resize(
-        gray,
-        (int(gray.shape[1] * scale), int(gray.shape[0] * scale)),
-        interpolation=cv2.INTER_CUBIC
-    )
 
-    # Noise reduction
-    denoised = cv2.fastNlMeansDenoising(gray, None, 15, 7, 21)
+# ---------------- FALLBACK OCR ---------------- #
+def extract_text_alternative_from_array(image, scale: float = None,
+                                        meter: StageMeter = None, profile: dict = None) -> str:
+    """Fallback OCR chain on an already deskewed BGR array."""
+    profile = profile or get_profile()
+    # The fallback has always used 80% of the main chain's upscale (2x vs 2.5x)
+    if scale is None:
+        scale = choose_scale(image, profile["max_scale"])
+    scale = round(scale * 0.8, 3)
 
-    # Contrast boost
-    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-    enhanced = clahe.apply(denoised)
-
-    # Adaptive threshold (best for newspapers)
-    binary = cv2.adaptiveThreshold(
-        enhanced, 255,
-        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-        cv2.THRESH_BINARY,
-        31, 11
+    stages = [
+        ("grayscale", lambda img: cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)),
+        ("resize", lambda gray: resize_for_ocr(gray, scale)),
+        ("threshold", lambda gray: cv2.threshold(
+            gray, 0, 255,
+            cv2.THRESH_BINARY + cv2.THRESH_OTSU
+        )[1]),
+    ]
+    binary = cached_binary(
+        image, "fallback", scale, profile, lambda: run_stages(image, stages, meter, chain="fallback"), meter
     )
 
-    # Morphology (safe for Hindi + English)
-    kernel = np.ones((2, 2), np.uint8)
-    binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel)
-
-    # Try multiple page segmentation modes
-    results = []
-    for psm in [1, 3, 4, 6]:
-        config = f'--oem 3 --psm {psm}'
-        text = pytesseract.image_to_string(
-            binary,
-            config=config,
-            lang='hin+eng'   # 🔥 THIS IS THE KEY
+    started = time.perf_counter()
+    if profile["words"]:
+        data = get_ocr_backend().image_to_data(binary, 3, profile["lang"])
+        text = words_to_image(with_words(text_from_words(data), data), binary, image)
+    else:
+        text = clean_text(
+            get_ocr_backend().image_to_string(binary, 3, profile["lang"])
         )
-        results.append(clean_text(text))
-
-    # Pick best result
-    best_text = max(results, key=lambda t: (len(t), t.count("\n")))
-    return best_text
+    if meter:
+        meter.record("fallback.ocr", time.perf_counter() - started)
+        meter.drop(binary)
+    return text
 
 
-# ---------------- FALLBACK OCR ---------------- #
 def extract_text_alternative(image_path: str) -> str:
     image = cv2.imread(image_path)
     if image is None:
         return ""
 
-    image = deskew_image(image)
+    return extract_text_alternative_from_array(deskew_image(image))
+
+
+# ---------------- ADAPTIVE OCR (EARLY EXIT) ---------------- #
+# OCR_ADAPTIVE=1 runs the historically best PSM for the source first and
+# stops there when the page reads confidently; otherwise the full sweep
+# (every PSM plus the fallback chain) runs as usual.
+OCR_ADAPTIVE = os.getenv("OCR_ADAPTIVE", "0") == "1"
+OCR_EARLY_EXIT_CONF = float(os.getenv("OCR_EARLY_EXIT_CONF", "70"))
+OCR_EARLY_EXIT_MIN_CHARS = int(os.getenv("OCR_EARLY_EXIT_MIN_CHARS", "200"))
+PSM_STATS_PATH = os.getenv("PSM_STATS_PATH", str(CACHE_DIR / "psm_stats.json"))
+
+
+def text_from_words(words: dict) -> str:
+    """Rebuild page text from word columns: one line per line, blank line per paragraph."""
+    lines = []
+    current = None
+    for i, text in enumerate(words["text"]):
+        key = (words["block_num"][i], words["par_num"][i], words["line_num"][i])
+        if key != current:
+            if current is not None and key[:2] != current[:2]:
+                lines.append("")
+            lines.append(text)
+            current = key
+        else:
+            lines[-1] += " " + text
+    return clean_text("\n".join(lines))
+
+
+def mean_confidence(words: dict) -> float:
+    confs = words["conf"]
+    return sum(confs) / len(confs) if confs else 0.0
+
+
+class PsmStats:
+    """How often each PSM produced the selected text, per newspaper source."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.wins = json.load(f)
+        except (OSError, ValueError):
+            self.wins = {}
+
+    def order(self, source=None, psm_modes=PSM_MODES):
+        # New sources start from the order learned over all sources
+        wins = self.wins.get(source or "default") or self.wins.get("default", {})
+        # Stable sort keeps psm_modes order for untried modes
+        return sorted(psm_modes, key=lambda psm: -wins.get(str(psm), 0))
+
+    def record(self, source, psm: int):
+        with self._lock:
+            for key in {source or "default", "default"}:
+                wins = self.wins.setdefault(key, {})
+                wins[str(psm)] = wins.get(str(psm), 0) + 1
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "w", encoding="utf-8") as f:
+                    json.dump(self.wins, f, ensure_ascii=False, indent=2)
+            except OSError as e:
+                print("[OCR WARNING] could not save PSM stats:", e)
+
+
+psm_stats = PsmStats(PSM_STATS_PATH)
+
+
+def run_psm_data_pass(binary, psm: int, meter: StageMeter = None, lang: str = OCR_LANG):
+    """(text, mean confidence); the text is an OcrText carrying its words."""
+    started = time.perf_counter()
+    words = get_ocr_backend().image_to_data(binary, psm, lang)
+    if meter:
+        meter.record(f"ocr.psm{psm}", time.perf_counter() - started)
+    return with_words(text_from_words(words), words), mean_confidence(words)
+
+
+def extract_text_adaptive(image, source: str = None, scale: float = None,
+                          meter: StageMeter = None, profile: dict = None):
+    """
+    Confidence-driven OCR of an already deskewed page. Returns the final
+    text and a dict describing which PSM won and whether we exited early.
+    """
+    profile = profile or get_profile()
+    if scale is None:
+        scale = choose_scale(image, profile["max_scale"])
+    binary = preprocess_image(image, scale, meter, profile)
+    psm_modes = profile["psm_modes"]
+    order = psm_stats.order(source, psm_modes)
+
+    first = order[0]
+    text, conf = run_psm_data_pass(binary, first, meter, profile["lang"])
+    if conf >= OCR_EARLY_EXIT_CONF and len(text) >= OCR_EARLY_EXIT_MIN_CHARS:
+        psm_stats.record(source, first)
+        words_to_image(text, binary, image)
+        if meter:
+            meter.drop(binary)
+        return text, {"psm": first, "mean_conf": round(conf, 2), "early_exit": True, "passes": 1}
+
+    # Hard page: full sweep, same selection rule as the fixed mode
+    if OCR_CONCURRENT:
+        pool = get_ocr_pool()
+        fallback = None
+        if profile["fallback"]:
+            fallback = pool.submit(extract_text_alternative_from_array, image, scale, meter, profile)
+        futures = [pool.submit(run_psm_data_pass, binary, psm, meter, profile["lang"]) for psm in order[1:]]
+        rest = [f.result() for f in futures]
+        text2 = fallback.result() if fallback else ""
+    else:
+        rest = [run_psm_data_pass(binary, psm, meter, profile["lang"]) for psm in order[1:]]
+        text2 = ""
+        if profile["fallback"]:
+            text2 = extract_text_alternative_from_array(image, scale, meter, profile)
+
+    # Compare in the profile's PSM order so ties break like the fixed sweep
+    by_psm = dict(zip(order, [(text, conf)] + rest))
+    text1 = words_to_image(select_best_text([by_psm[psm][0] for psm in psm_modes]), binary, image)
+    if meter:
+        meter.drop(binary)
+    best_psm = next(psm for psm in psm_modes if by_psm[psm][0] == text1)
+    psm_stats.record(source, best_psm)
+
+    info = {
+        "psm": best_psm,
+        "mean_conf": round(by_psm[best_psm][1], 2),
+        "early_exit": False,
+        "passes": len(by_psm) + int(profile["fallback"]),
+    }
+    if len(text2) > len(text1):
+        info["psm"] = "fallback"
+        return text2, info
+    return text1, info
+
+
+# ---------------- LAYOUT ANALYSIS ---------------- #
+# Blocks are OCR'd with single-column PSMs; the page-level modes 1 and 3
+# only add cost on an already isolated article.
+BLOCK_PSM_MODES = [4, 6]
+LAYOUT_MIN_BLOCK_AREA = 0.003     # fraction of the page
+LAYOUT_MAX_INK_DENSITY = 0.6      # denser blocks are photos / adverts
+LAYOUT_MAX_PHOTO_TEXTURE = 0.3    # share of mid-contrast texture; above it, a photo
+LAYOUT_HEADLINE_SCALE = 1.25      # type this much taller than body text is a headline
+LAYOUT_MIN_BLOCK_LETTERS = 25     # fewer OCR'd letters: a logo, icon strip or caption
+LAYOUT_BLOCK_PADDING = 8
+
+
+def _estimate_text_height(ink) -> int:
+    """Median height of character-sized connected components."""
+    _, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    # Ignore specks and photo texture
+    keep = (heights > 4) & (widths > 4) & (heights < ink.shape[0] // 10) & (stats[1:, cv2.CC_STAT_AREA] > 20)
+    return int(np.median(heights[keep])) if keep.any() else 12
+
+
+def _gaps(profile, min_gap: int, tolerance: int):
+    """(start, end) runs of near-empty rows/columns at least min_gap long."""
+    empty = np.concatenate(([False], profile <= tolerance, [False]))
+    edges = np.flatnonzero(np.diff(empty.astype(np.int8)))
+    runs = edges.reshape(-1, 2)
+    return [(a, b) for a, b in runs if b - a >= min_gap]
+
+
+def _xy_cut(ink, x, y, w, h, min_gap_x, min_gap_y, fragments, depth=0):
+    region = ink[y:y + h, x:x + w]
+    rows = np.count_nonzero(region, axis=1)
+    cols = np.count_nonzero(region, axis=0)
+
+    # Trim empty margins
+    filled_rows = np.flatnonzero(rows > 1)
+    filled_cols = np.flatnonzero(cols > 1)
+    if filled_rows.size == 0 or filled_cols.size == 0:
+        return
+    y0, y1 = filled_rows[0], filled_rows[-1] + 1
+    x0, x1 = filled_cols[0], filled_cols[-1] + 1
+    x, y, w, h = x + x0, y + y0, x1 - x0, y1 - y0
+    rows, cols = rows[y0:y1], cols[x0:x1]
+
+    if depth < 12:
+        # Column gutters first, then the horizontal gaps between stories
+        col_gaps = _gaps(cols, min_gap_x, max(1, h // 200))
+        row_gaps = _gaps(rows, min_gap_y, max(1, w // 200))
+        for gaps, vertical in ((col_gaps, True), (row_gaps, False)):
+            if not gaps:
+                continue
+            start = 0
+            cuts = [(a, b) for a, b in gaps] + [(w if vertical else h, None)]
+            for a, b in cuts:
+                if a > start:
+                    if vertical:
+                        _xy_cut(ink, x + start, y, a - start, h, min_gap_x, min_gap_y, fragments, depth + 1)
+                    else:
+                        _xy_cut(ink, x, y + start, w, a - start, min_gap_x, min_gap_y, fragments, depth + 1)
+                start = b
+            return
+
+    fragments.append((int(x), int(y), int(w), int(h)))
+
+
+def _separated_by_rule(rules, x0, y0, x1, y1) -> bool:
+    if x1 <= x0 or y1 <= y0:
+        return False
+    return cv2.countNonZero(rules[y0:y1, x0:x1]) > 0
+
+
+def _group_fragments(fragments, rules, text_h: int):
+    """
+    Group XY-cut fragments into articles (union-find over the original
+    fragments, so one wide headline can't swallow the whole page).
+    Paragraphs of one column join when the gap between them is small,
+    and the words of a large headline join along their line. A printed
+    rule between two fragments always keeps them apart.
+    """
+    parent = list(range(len(fragments)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def separated_by_rule(x0, y0, x1, y1):
+        return _separated_by_rule(rules, x0, y0, x1, y1)
+
+    for i, (ax, ay, aw, ah) in enumerate(fragments):
+        for j in range(i + 1, len(fragments)):
+            bx, by, bw, bh = fragments[j]
+            overlap_x = min(ax + aw, bx + bw) - max(ax, bx)
+            overlap_y = min(ay + ah, by + bh) - max(ay, by)
+
+            same_column = (
+                overlap_x >= 0.5 * min(aw, bw)
+                and -overlap_y < text_h * 1.2
+                and not separated_by_rule(max(ax, bx), min(ay + ah, by + bh), min(ax + aw, bx + bw), max(ay, by))
+            )
+            # Words of one headline line share top and bottom edges
+            aligned = overlap_y >= 0.8 * max(ah, bh)
+            same_headline = (
+                (max(ah, bh) <= text_h * 4 and overlap_y >= 0.5 * min(ah, bh)
+                 or max(ah, bh) <= text_h * 8 and aligned)
+                and -overlap_x < min(ah, bh)
+                and not separated_by_rule(min(ax + aw, bx + bw), max(ay, by), max(ax, bx), min(ay + ah, by + bh))
+            )
+            if same_column or same_headline:
+                parent[find(j)] = find(i)
+
+    groups = {}
+    for i, fragment in enumerate(fragments):
+        groups.setdefault(find(i), []).append(fragment)
+    return list(groups.values())
+
+
+def block_bounds(block):
+    x0 = min(x for x, _, _, _ in block)
+    y0 = min(y for _, y, _, _ in block)
+    x1 = max(x + w for x, _, w, _ in block)
+    y1 = max(y + h for _, y, _, h in block)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def _type_height(ink, block) -> float:
+    """Median letter (connected component) height in a block."""
+    heights = []
+    for x, y, w, h in block:
+        _, _, stats, _ = cv2.connectedComponentsWithStats(ink[y:y + h, x:x + w], connectivity=8)
+        letters = stats[1:, cv2.CC_STAT_HEIGHT]
+        heights.extend(letters[letters > 4])
+    return float(np.median(heights)) if heights else 0.0
+
+
+def _photo_texture(gray, block) -> float:
+    """
+    Share of a block's pixels with mid local contrast. Print is flat paper
+    and sharp letter edges; photos are shaded all over.
+    """
+    textured = total = 0
+    for x, y, w, h in block:
+        patch = gray[y:y + h, x:x + w].astype(np.float32)
+        mean = cv2.blur(patch, (5, 5))
+        std = np.sqrt(np.maximum(cv2.blur(patch * patch, (5, 5)) - mean * mean, 0))
+        textured += np.count_nonzero((std > 6) & (std < 25))
+        total += w * h
+    return textured / float(total) if total else 0.0
+
+
+def _merge_headlines(blocks, ink, rules, text_h: int):
+    """
+    Join headlines to their stories. Large-type blocks on one line are one
+    headline split at its word gaps; blocks that overlap are one article;
+    a headline takes the blocks right below it that it spans. A printed
+    rule between two blocks still keeps them apart.
+    """
+    bounds = [block_bounds(block) for block in blocks]
+    headline = [_type_height(ink, block) >= LAYOUT_HEADLINE_SCALE * text_h for block in blocks]
+    parent = list(range(len(blocks)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, (ax, ay, aw, ah) in enumerate(bounds):
+        for j, (bx, by, bw, bh) in enumerate(bounds):
+            if i == j:
+                continue
+            overlap_x = min(ax + aw, bx + bw) - max(ax, bx)
+            overlap_y = min(ay + ah, by + bh) - max(ay, by)
+
+            overlapping = overlap_x > 0 and overlap_y > 0 and overlap_x * overlap_y >= 0.25 * min(aw * ah, bw * bh)
+            same_line = (
+                headline[i] and headline[j]
+                and overlap_y >= 0.5 * min(ah, bh)
+                and -overlap_x < min(ah, bh)
+                and not _separated_by_rule(rules, min(ax + aw, bx + bw), max(ay, by), max(ax, bx), min(ay + ah, by + bh))
+            )
+            gap = by - (ay + ah)
+            below = (
+                headline[i]
+                and by >= ay + ah // 2 and gap <= 2 * text_h
+                and overlap_x >= 0.5 * min(aw, bw)
+                and not _separated_by_rule(rules, max(ax, bx), ay + ah, min(ax + aw, bx + bw), by)
+            )
+            if overlapping or same_line or below:
+                parent[find(j)] = find(i)
+
+    merged = {}
+    for i, block in enumerate(blocks):
+        merged.setdefault(find(i), []).extend(block)
+    return list(merged.values())
+
+
+def find_article_blocks(image):
+    """
+    Split a deskewed newspaper page into article blocks by whitespace
+    analysis: a recursive XY-cut finds column gutters and the gaps
+    between paragraphs, then the fragments are grouped back into
+    articles, and headlines are joined to the stories below them.
+    Printed rules are removed from the ink and used as hard separators.
+    Photos (see _photo_texture) are left out.
+
+    Returns one list of (x, y, w, h) fragments per article, in reading
+    order (column by column, top to bottom).
+    """
     gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    page_h, page_w = gray.shape
 
-    gray = cv2.resize(
-        gray,
-        (gray.shape[1] * 2, gray.shape[0] * 2),
-        interpolation=cv2.INTER_CUBIC
+    ink = cv2.adaptiveThreshold(
+        gray, 255,
+        cv2.ADAPTIVE_THRESH_MEAN_C,
+        cv2.THRESH_BINARY_INV,
+        25, 15
     )
+    text_h = _estimate_text_height(ink)
 
-    _, binary = cv2.threshold(
-        gray, 0, 255,
-        cv2.THRESH_BINARY + cv2.THRESH_OTSU
+    # Rules span a good part of a column; headline bars (shirorekha) don't
+    rules = cv2.bitwise_or(
+        cv2.morphologyEx(ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (max(40, page_w // 5), 1))),
+        cv2.morphologyEx(ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(40, page_h // 5))))
     )
+    ink = cv2.bitwise_and(ink, cv2.bitwise_not(cv2.dilate(rules, np.ones((5, 5), np.uint8))))
+    # Specks would bridge the gutters
+    ink = cv2.morphologyEx(ink, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))
+
+    fragments = []
+    _xy_cut(
+        ink, 0, 0, page_w, page_h,
+        max(4, int(text_h * 0.6)), max(3, int(text_h * 0.35)),
+        fragments
+    )
+    fragments = [f for f in fragments if f[2] * f[3] >= text_h * text_h // 2]
+
+    # Photos go before the headline pass, so a caption can't pull one in
+    blocks = [
+        block for block in _group_fragments(fragments, rules, text_h)
+        if _photo_texture(gray, block) <= LAYOUT_MAX_PHOTO_TEXTURE
+    ]
+
+    min_area = LAYOUT_MIN_BLOCK_AREA * page_h * page_w
+    kept = []
+    for block in _merge_headlines(blocks, ink, rules, text_h):
+        area = sum(w * h for _, _, w, h in block)
+        if area < min_area:
+            continue
+        density = sum(cv2.countNonZero(ink[y:y + h, x:x + w]) for x, y, w, h in block) / float(area)
+        if density > LAYOUT_MAX_INK_DENSITY:
+            continue
+        kept.append(sorted(block, key=lambda f: (f[1], f[0])))
+    blocks = kept
+
+    # Reading order: left-edge buckets approximate columns
+    column_w = max(1, page_w // 12)
+    blocks.sort(key=lambda b: (block_bounds(b)[0] // column_w, block_bounds(b)[1]))
+    return blocks
+
+
+def block_origin(block, padding: int = LAYOUT_BLOCK_PADDING):
+    """Page coordinates of the top-left corner of crop_block(block)."""
+    x, y, _, _ = block_bounds(block)
+    return max(0, x - padding), max(0, y - padding)
+
+
+def crop_block(image, block, padding: int = LAYOUT_BLOCK_PADDING):
+    """Crop an article's bounding box, blanking anything outside its fragments."""
+    page_h, page_w = image.shape[:2]
+    x, y, w, h = block_bounds(block)
+    x0, y0 = block_origin(block, padding)
+    x1, y1 = min(page_w, x + w + padding), min(page_h, y + h + padding)
+
+    crop = np.full((y1 - y0, x1 - x0, 3), 255, dtype=image.dtype)
+    for fx, fy, fw, fh in block:
+        fx0, fy0 = max(x0, fx - padding), max(y0, fy - padding)
+        fx1, fy1 = min(x1, fx + fw + padding), min(y1, fy + fh + padding)
+        crop[fy0 - y0:fy1 - y0, fx0 - x0:fx1 - x0] = image[fy0:fy1, fx0:fx1]
+    return crop
+
+
+def extract_block_text(block_image, meter: StageMeter = None, profile: dict = None) -> str:
+    """Main chain on one article block; runs inside a pool task, so serially."""
+    profile = profile or get_profile()
+    binary = preprocess_image(block_image, meter=meter, profile=profile)
+    text = select_best_text([
+        run_psm_pass(binary, psm, meter, profile["lang"], profile["words"]) for psm in BLOCK_PSM_MODES
+    ])
+    words_to_image(text, binary, block_image)
+    if meter:
+        meter.drop(binary)
+    return text
+
+
+def extract_articles_from_array(image, meter: StageMeter = None, profile: dict = None, screen=None):
+    """
+    One OCR'd text per article block, or None when no layout was found.
+    screen(crop) -> bool, if given, is asked first; blocks it rejects are
+    left out without running the full chain.
+    """
+    started = time.perf_counter()
+    blocks = find_article_blocks(image)
+    if meter:
+        meter.record("layout", time.perf_counter() - started)
+    if len(blocks) < 2:
+        return None
+
+    def ocr_block(block):
+        crop = crop_block(image, block)
+        if meter:
+            meter.hold(crop)
+        try:
+            if screen and not screen(crop):
+                return ""
+            text = extract_block_text(crop, meter, profile)
+            if getattr(text, "words", None) is not None:
+                dx, dy = block_origin(block)
+                text.words = transform_words(text.words, dx=dx, dy=dy)
+            return text
+        finally:
+            if meter:
+                meter.drop(crop)
+
+    if OCR_CONCURRENT:
+        texts = list(get_ocr_pool().map(ocr_block, blocks))
+    else:
+        texts = [ocr_block(block) for block in blocks]
+    # Mastheads, logos and icon strips read as a few stray letters
+    return [text for text in texts if sum(ch.isalpha() for ch in text) >= LAYOUT_MIN_BLOCK_LETTERS]
+
+
+# ---------------- CASCADE (CRIME PRE-FILTER) ---------------- #
+# Most of a page is not crime news. In cascade mode every article block is
+# first read cheaply: only its headline and lead (the top of the block), at
+# no more than native resolution, Otsu threshold, one PSM pass. Blocks whose
+# lead has none of keyword_extractor's crime keywords are skipped; the rest
+# get the full preprocessing chain and PSM sweep.
+# OCR_CASCADE=1 makes cascade the default for requests that don't choose.
+OCR_CASCADE = os.getenv("OCR_CASCADE", "0") == "1"
+CASCADE_LEAD_FRACTION = float(os.getenv("OCR_CASCADE_LEAD_FRACTION", "0.35"))
+CASCADE_LEAD_MIN_HEIGHT = int(os.getenv("OCR_CASCADE_LEAD_MIN_HEIGHT", "160"))
+CASCADE_MAX_SCALE = float(os.getenv("OCR_CASCADE_MAX_SCALE", "1.0"))
+CASCADE_PSM = 6
 
-    return clean_text(
-        pytesseract.image_to_string(
-            binary,
-            config='--oem 3 --psm 3',
-            lang='hin+eng'
+
+def _crime_keywords():
+    # Imported here so plain OCR doesn't need the extractor's NER setup
+    from app.services.keyword_extractor import crime_screening_keywords
+    return crime_screening_keywords
+
+
+def lead_crop(block_image):
+    """Top of an article block: the headline and the first lines of the lead."""
+    height = block_image.shape[0]
+    return block_image[:max(min(height, CASCADE_LEAD_MIN_HEIGHT), int(height * CASCADE_LEAD_FRACTION))]
+
+
+def screen_block(block_image, meter: StageMeter = None, profile: dict = None) -> bool:
+    """Cheap OCR of a block's headline and lead; True if it mentions a crime."""
+    from app.services.keyword_extractor import mentions_crime
+
+    profile = profile or get_profile()
+    lead = lead_crop(block_image)
+    scale = choose_scale(lead, CASCADE_MAX_SCALE)
+    stages = [
+        ("grayscale", lambda img: cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)),
+        ("resize", lambda gray: resize_for_ocr(gray, scale)),
+        ("threshold", lambda gray: cv2.threshold(
+            gray, 0, 255,
+            cv2.THRESH_BINARY + cv2.THRESH_OTSU
+        )[1]),
+    ]
+    binary = run_stages(lead, stages, meter, chain="cascade")
+
+    started = time.perf_counter()
+    text = get_ocr_backend().image_to_string(binary, CASCADE_PSM, profile["lang"])
+    if meter:
+        meter.record("cascade.ocr", time.perf_counter() - started)
+        meter.drop(binary)
+    return mentions_crime(text)
+
+
+def extract_crime_articles_from_array(image, meter: StageMeter = None, profile: dict = None):
+    """
+    Cascade version of extract_articles_from_array. Returns (texts, info):
+    texts is None when no layout was found, info counts the blocks screened
+    and the blocks skipped.
+    """
+    verdicts = []
+
+    def screen(crop):
+        hit = screen_block(crop, meter, profile)
+        verdicts.append(hit)
+        return hit
+
+    texts = extract_articles_from_array(image, meter, profile, screen)
+    return texts, {"cascade_screened": len(verdicts), "cascade_skipped": verdicts.count(False)}
+
+
+# ---------------- TILED OCR ---------------- #
+# Pages whose working image would exceed OCR_MAX_WORKING_PIXELS are OCR'd
+# as overlapping tiles at full text scale instead of being downscaled.
+# Working memory then scales with OCR_TILE_SIZE (times the pool size), not
+# with the page. Cuts are moved to the emptiest row/column nearby so they
+# fall in gutters and line gaps rather than through words. Tiles are always
+# read with word boxes, and the page text is rebuilt from the words each
+# tile's core keeps, so the overlap strips are deduplicated by position.
+# OCR_TILING=auto (default) | on (always) | off (never)
+OCR_TILING = os.getenv("OCR_TILING", "auto")
+OCR_TILE_SIZE = int(os.getenv("OCR_TILE_SIZE", "2400"))
+OCR_TILE_OVERLAP = int(os.getenv("OCR_TILE_OVERLAP", "96"))
+TILE_CUT_SEARCH = 0.15
+
+
+def use_tiling(image, scale: float) -> bool:
+    if OCR_TILING == "on":
+        return True
+    if OCR_TILING != "auto":
+        return False
+    h, w = image.shape[:2]
+    return (h * scale) * (w * scale) > OCR_MAX_WORKING_PIXELS
+
+
+def _tile_cuts(ink_profile, factor: float, length: int, tile_len: float):
+    """Cut positions along one axis, about tile_len apart, snapped to low ink."""
+    count = max(1, int(np.ceil(length / tile_len)))
+    cuts = [0]
+    for i in range(1, count):
+        nominal = i * length / float(count)
+        window = tile_len * TILE_CUT_SEARCH
+        lo = max(0, int((nominal - window) * factor))
+        hi = min(len(ink_profile), int((nominal + window) * factor) + 1)
+        snapped = lo + int(np.argmin(ink_profile[lo:hi])) if hi > lo else int(nominal * factor)
+        cuts.append(int(snapped / factor))
+    cuts.append(length)
+    return cuts
+
+
+def plan_tiles(image, scale: float):
+    """
+    {(row, col): (y0, y1, x0, x1)} tile bounds in page pixels, overlap
+    included. Tiles are OCR_TILE_SIZE working pixels on a side.
+    """
+    h, w = image.shape[:2]
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    factor = min(1.0, SCALE_ESTIMATE_MAX_SIDE / float(max(h, w)))
+    small = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA) if factor < 1.0 else gray
+    ink = cv2.threshold(small, 0, 1, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)[1]
+
+    tile_len = OCR_TILE_SIZE / scale
+    overlap = int(OCR_TILE_OVERLAP / scale)
+    ys = _tile_cuts(ink.sum(axis=1), factor, h, tile_len)
+    xs = _tile_cuts(ink.sum(axis=0), factor, w, tile_len)
+
+    tiles = {}
+    for row in range(len(ys) - 1):
+        for col in range(len(xs) - 1):
+            tiles[(row, col)] = (
+                max(0, ys[row] - overlap), min(h, ys[row + 1] + overlap),
+                max(0, xs[col] - overlap), min(w, xs[col + 1] + overlap),
+            )
+    return tiles
+
+
+def ocr_tile(tile, scale: float, meter: StageMeter = None, profile: dict = None) -> str:
+    """Main chain (and fallback, if the profile has it) on one tile, serially."""
+    profile = profile or get_profile()
+    binary = preprocess_image(tile, scale, meter, profile)
+    text = select_best_text([
+        run_psm_pass(binary, psm, meter, profile["lang"], profile["words"]) for psm in profile["psm_modes"]
+    ])
+    words_to_image(text, binary, tile)
+    if meter:
+        meter.drop(binary)
+
+    if profile["fallback"]:
+        text2 = extract_text_alternative_from_array(tile, scale, meter, profile)
+        if len(text2) > len(text):
+            text = text2
+    return text
+
+
+def extract_text_tiled(image, scale: float, meter: StageMeter = None, profile: dict = None):
+    """OCR an already deskewed page tile by tile. Returns (text, tiling info)."""
+    profile = profile or get_profile()
+    tiles = plan_tiles(image, scale)
+    largest = max((y1 - y0) * (x1 - x0) for y0, y1, x0, x1 in tiles.values())
+    # Word boxes are what the overlap strips are deduplicated by
+    tile_profile = dict(profile, words=True)
+
+    def run(bounds):
+        y0, y1, x0, x1 = bounds
+        # A view, not a copy: only the tile's working buffers are allocated
+        return ocr_tile(image[y0:y1, x0:x1], scale, meter, tile_profile)
+
+    keys = list(tiles)
+    if OCR_CONCURRENT:
+        texts = list(get_ocr_pool().map(run, [tiles[key] for key in keys]))
+    else:
+        texts = [run(tiles[key]) for key in keys]
+    info = {"tiles": len(tiles), "tile_working_pixels": int(largest * scale * scale)}
+    words = merge_tile_words(tiles, dict(zip(keys, texts)))
+    text = text_from_words(words)
+    if profile["words"]:
+        text = with_words(text, words)
+    return text, info
+
+
+def merge_tile_words(tiles, tile_texts) -> dict:
+    """
+    Word columns of all tiles in page pixels. A word in an overlap is kept
+    only by the tile whose core (its bounds without the overlap, split at
+    the middle of each shared strip) holds the word's centre.
+    """
+    def core(row, col):
+        y0, y1, x0, x1 = tiles[(row, col)]
+        above, below = tiles.get((row - 1, col)), tiles.get((row + 1, col))
+        left, right = tiles.get((row, col - 1)), tiles.get((row, col + 1))
+        return (
+            (y0 + above[1]) // 2 if above else y0, (y1 + below[0]) // 2 if below else y1,
+            (x0 + left[3]) // 2 if left else x0, (x1 + right[2]) // 2 if right else x1,
         )
+
+    parts = []
+    for row, col in sorted(tile_texts, key=lambda key: (key[1], key[0])):
+        words = getattr(tile_texts[(row, col)], "words", None)
+        if words is None:
+            continue
+        y0, y1, x0, x1 = tiles[(row, col)]
+        cy0, cy1, cx0, cx1 = core(row, col)
+        parts.append(transform_words(
+            words, dx=x0, dy=y0,
+            keep=lambda w: cy0 <= w["top"] + w["height"] / 2.0 < cy1 and cx0 <= w["left"] + w["width"] / 2.0 < cx1
+        ))
+    return concat_words(parts)
+
+
+# ---------------- OCR RESULT CACHE ---------------- #
+# Results are keyed by sha256(OCR config + image bytes), so re-running a
+# report over the same uploads, or a re-uploaded file, skips OCR entirely.
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "1") == "1"
+OCR_CACHE_PATH = os.getenv("OCR_CACHE_PATH", str(CACHE_DIR / "ocr_results.sqlite3"))
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Bump when preprocessing changes in a way that alters OCR output
+OCR_PIPELINE_VERSION = 4
+
+_ocr_cache = None
+_ocr_cache_lock = threading.Lock()
+
+
+def ocr_config(split_articles: bool = False, profile: str = None, lang: str = None,
+               cascade: bool = False, words: bool = False) -> dict:
+    """Everything that affects the OCR output, used as part of the cache key."""
+    config = {
+        "pipeline": OCR_PIPELINE_VERSION,
+        "backend": get_ocr_backend().name,
+        # Detection is deterministic per image, so the detector stands in for it
+        "lang": lang or f"detect:{OCR_SCRIPT_DETECT}:{OCR_LANG}",
+        "profile": get_profile(profile)["name"],
+        "psm_modes": PSM_MODES,
+        "deskew": [DESKEW_MAX_SIDE, DESKEW_MAX_ANGLE, DESKEW_TOLERANCE],
+        "scaling": [OCR_TARGET_TEXT_HEIGHT, OCR_MIN_SCALE, OCR_MAX_SCALE, OCR_MAX_WORKING_PIXELS],
+        "tiling": [OCR_TILING, OCR_TILE_SIZE, OCR_TILE_OVERLAP],
+    }
+    if split_articles or cascade:
+        config["block_psm_modes"] = BLOCK_PSM_MODES
+    if cascade:
+        config["cascade"] = [
+            CASCADE_LEAD_FRACTION, CASCADE_LEAD_MIN_HEIGHT, CASCADE_MAX_SCALE, CASCADE_PSM,
+            content_key("\n".join(_crime_keywords()).encode("utf-8"), {})
+        ]
+    if OCR_ADAPTIVE:
+        config["early_exit"] = [OCR_EARLY_EXIT_CONF, OCR_EARLY_EXIT_MIN_CHARS]
+    if words:
+        # Text is rebuilt from the word columns in this mode
+        config["words"] = list(WORD_COLUMNS)
+    return config
+
+
+def get_ocr_cache():
+    global _ocr_cache
+    if not OCR_CACHE_ENABLED:
+        return None
+    with _ocr_cache_lock:
+        if _ocr_cache is None:
+            _ocr_cache = SqliteResultCache(OCR_CACHE_PATH, OCR_CACHE_MAX_BYTES)
+    return _ocr_cache
+
+
+def ocr_cache_stats() -> dict:
+    cache = get_ocr_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+# ---------------- IMAGE DECODING ---------------- #
+def decode_image_bytes(image_bytes: bytes):
+    """Decode raw upload bytes straight into a BGR array (no temp file)."""
+    image = cv2.imdecode(
+        np.frombuffer(image_bytes, dtype=np.uint8),
+        cv2.IMREAD_COLOR
     )
+    if image is not None:
+        return image
+
+    # Formats OpenCV can't read (GIF, some TIFFs) still go through PIL
+    rgb = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    return cv2.cvtColor(np.asarray(rgb), cv2.COLOR_RGB2BGR)
+
+
+# ---------------- BYTES / BASE64 PROCESSOR ---------------- #
+def _extract_texts_concurrently(image, scale: float = None, meter: StageMeter = None,
+                                profile: dict = None):
+    """Primary PSM passes and the fallback pass, all on the shared OCR pool."""
+    profile = profile or get_profile()
+    pool = get_ocr_pool()
+
+    # The fallback chain is cheap to preprocess, so it goes to the pool whole
+    # while the main chain is preprocessed here. No task submits further
+    # tasks, so a full pool can never deadlock.
+    fallback = None
+    if profile["fallback"]:
+        fallback = pool.submit(extract_text_alternative_from_array, image, scale, meter, profile)
+
+    binary = preprocess_image(image, scale, meter, profile)
+    futures = submit_psm_passes(binary, pool, profile["psm_modes"], meter, profile["lang"], profile["words"])
+
+    text1 = words_to_image(select_best_text([f.result() for f in futures]), binary, image)
+    if meter:
+        meter.drop(binary)
+    text2 = fallback.result() if fallback else ""
+    return text1, text2
+
+
+def _run_ocr_pipeline(image_bytes: bytes, split_articles: bool = False, source: str = None,
+                      profile: dict = None, cascade: bool = False):
+    profile = profile or get_profile()
+    meter = StageMeter()
+    started = time.perf_counter()
+
+    # Decode and deskew once; both OCR chains share the same array
+    image = decode_image_bytes(image_bytes)
+    meter.hold(image)
+    meter.record("decode", time.perf_counter() - started)
+
+    stage_started = time.perf_counter()
+    deskewed, skew_angle = deskew_with_angle(image)
+    if deskewed is not image:
+        meter.hold(deskewed)
+        meter.drop(image)
+    image = deskewed
+    meter.record("deskew", time.perf_counter() - stage_started)
+
+    lang_source = "hint"
+    if profile["lang"] is None:
+        stage_started = time.perf_counter()
+        profile = dict(profile, lang=detect_ocr_lang(image))
+        lang_source = "detected"
+        meter.record("script_detect", time.perf_counter() - stage_started)
 
+    height, width = image.shape[:2]
+    scale = choose_scale(image, profile["max_scale"], max_pixels=None)
+    tiled = use_tiling(image, scale)
+    if not tiled:
+        scale = min(scale, round((OCR_MAX_WORKING_PIXELS / float(height * width)) ** 0.5, 3))
+    metadata = {
+        "profile": profile["name"],
+        "lang": profile["lang"],
+        "lang_source": lang_source,
+        "skew_angle": skew_angle,
+        "width": width,
+        "height": height,
+        "scale": scale,
+        "working_pixels": int(width * scale) * int(height * scale),
+    }
 
-# ---------------- BASE64 PROCESSOR ---------------- #
-def process_base64_images(base64_image: str):
-    articles = []
+    articles = None
+    screened_out = False
+    if cascade:
+        articles, info = extract_crime_articles_from_array(image, meter, profile)
+        metadata.update(info)
+        metadata["layout_blocks"] = info["cascade_screened"]
+        # Skipped blocks aren't crime news; don't OCR them as a whole page instead
+        screened_out = info["cascade_skipped"] > 0
+    elif split_articles:
+        articles = extract_articles_from_array(image, meter, profile)
+        metadata["layout_blocks"] = len(articles) if articles else 0
+
+    if not articles and screened_out:
+        articles = []
+
+    elif not articles and tiled:
+        text, info = extract_text_tiled(image, scale, meter, profile)
+        metadata.update(info)
+        articles = [text]
+
+    elif not articles and OCR_ADAPTIVE:
+        text, info = extract_text_adaptive(image, source, scale, meter, profile)
+        metadata.update(info)
+        articles = [text]
+
+    elif not articles:
+        if OCR_CONCURRENT:
+            text1, text2 = _extract_texts_concurrently(image, scale, meter, profile)
+        else:
+            text1 = extract_text_from_array(image, False, scale, meter, profile)
+            text2 = ""
+            if profile["fallback"]:
+                text2 = extract_text_alternative_from_array(image, scale, meter, profile)
+
+        final_text = text2 if len(text2) > len(text1) else text1
+        articles = [final_text]
+
+    metadata["stage_ms"] = meter.stage_ms
+    metadata["total_ms"] = round((time.perf_counter() - started) * 1000.0, 2)
+    metadata["peak_working_bytes"] = meter.peak
+    result = {"articles": [str(text) for text in articles], "metadata": metadata}
+    if profile["words"]:
+        # One set of word columns per article, boxes in deskewed page pixels
+        result["words"] = [getattr(text, "words", None) or empty_words() for text in articles]
+    return result
+
+
+def ocr_image_bytes(image_bytes: bytes, use_cache: bool = True, split_articles: bool = False,
+                    source: str = None, profile: str = None, lang=None, cascade: bool = None,
+                    words: bool = None) -> dict:
+    """
+    OCR one newspaper image. Returns {"articles": [...], "metadata": {...}};
+    articles holds the whole page as a single entry, or one entry per article
+    block when split_articles is set. source (e.g. the newspaper name) keys
+    the learned PSM order in adaptive mode; profile names one of
+    PREPROCESS_PROFILES (ValueError if unknown, default OCR_PROFILE); lang
+    is a language hint (see resolve_lang_hint), detected from the page if
+    missing; an unrecognised hint is ignored and reported as
+    metadata["lang_source"] = "invalid-hint". cascade (default OCR_CASCADE) splits the page and keeps only
+    the blocks whose headline mentions a crime; metadata["cascade_skipped"]
+    counts the rest. words (default OCR_WORDS) adds "words": one dict of
+    word columns (WORD_COLUMNS) per article, boxes in deskewed page pixels.
+    """
+    settings = dict(get_profile(profile), lang=resolve_lang_hint(lang))
+    if words is not None:
+        settings["words"] = words
+    cascade = OCR_CASCADE if cascade is None else cascade
+    result = {"articles": [], "metadata": {}}
+    cache = get_ocr_cache() if use_cache else None
+    cache_key = None
+    if cache:
+        cache_key = content_key(
+            image_bytes, ocr_config(split_articles, settings["name"], settings["lang"], cascade, settings["words"])
+        )
 
     try:
-        image = Image.open(
-            io.BytesIO(base64.b64decode(base64_image))
-        ).convert("RGB")
+        cached = cache.get(cache_key) if cache else None
+        if cache:
+            metrics.OCR_CACHE_LOOKUPS.labels(result="miss" if cached is None else "hit").inc()
+        if cached is not None:
+            cached["metadata"]["cached"] = True
+            result = cached
+        else:
+            with metrics.OCR_IN_PROGRESS.track_inprogress():
+                result = _run_ocr_pipeline(image_bytes, split_articles, source, settings, cascade)
+            result["metadata"]["cached"] = False
+            metrics.OCR_PAGE_SECONDS.labels(profile=settings["name"]).observe(result["metadata"]["total_ms"] / 1000.0)
 
-        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
-            image.save(tmp.name, "JPEG", quality=95)
+            # A page whose blocks were all screened out is a valid (empty) result
+            if cache and (result["articles"] or result["metadata"].get("cascade_skipped")):
+                cache.put(cache_key, result)
 
-            text1 = extract_text_from_image(tmp.name)
-            text2 = extract_text_alternative(tmp.name)
+    except Exception as e:
+        print("[OCR ERROR]", e)
+
+    if result["metadata"] and is_invalid_lang_hint(lang):
+        # The hint was ignored and the script detected instead
+        print(f"[OCR WARNING] unknown language hint {lang!r}, detected the script instead")
+        result["metadata"]["lang_source"] = "invalid-hint"
+    return result
+
+
+def process_image_bytes(image_bytes: bytes, use_cache: bool = True, split_articles: bool = False,
+                        source: str = None, profile: str = None, lang=None, cascade: bool = None):
+    return ocr_image_bytes(image_bytes, use_cache, split_articles, source, profile, lang, cascade)["articles"]
 
-            final_text = text2 if len(text2) > len(text1) else text1
-            articles.append(final_text)
 
+def ocr_base64_image(base64_image: str, split_articles: bool = False, source: str = None,
+                     profile: str = None, lang=None, cascade: bool = None, words: bool = None) -> dict:
+    """ocr_image_bytes() for a base64 upload; undecodable input gives no articles."""
+    try:
+        image_bytes = base64.b64decode(base64_image)
     except Exception as e:
         print("[OCR ERROR]", e)
+        return {"articles": [], "metadata": {}}
+
+    return ocr_image_bytes(
+        image_bytes, split_articles=split_articles, source=source, profile=profile, lang=lang, cascade=cascade,
+        words=words
+    )
+
 
-    return articles
+def process_base64_images(base64_image: str, split_articles: bool = False, source: str = None,
+                          profile: str = None, lang=None, cascade: bool = None):
+    return ocr_base64_image(base64_image, split_articles, source, profile, lang, cascade)["articles"]
@@ -0,0 +1,361 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+# Local cache files live next to the app unless CACHE_DIR says otherwise
+CACHE_DIR = Path(os.getenv("CACHE_DIR", Path(__file__).resolve().parent.parent / "cache"))
+
+
+def content_key(data: bytes, config) -> str:
+    """sha256 over the config (as canonical JSON) followed by the raw bytes."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(config, sort_keys=True).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class SqliteResultCache:
+    """
+    Size-bounded key/value store in a local SQLite file.
+
+    Values are JSON-serialisable objects. When the stored payload exceeds
+    max_bytes the least recently read entries are evicted. Hit/miss counts
+    are kept in the same file so every uvicorn worker reports the totals.
+    """
+
+    def __init__(self, path, max_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                cache_key   TEXT PRIMARY KEY,
+                value       TEXT NOT NULL,
+                size        INTEGER NOT NULL,
+                created_at  REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                hits        INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (accessed_at)"
+        )
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_stats (
+                name  TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "INSERT OR IGNORE INTO cache_stats (name, value) VALUES ('hits', 0), ('misses', 0), ('evictions', 0)"
+        )
+        self._conn.commit()
+
+    def _bump(self, name: str, amount: int = 1):
+        self._conn.execute("UPDATE cache_stats SET value = value + ? WHERE name = ?", (amount, name))
+
+    def get(self, key: str, max_age: float = None):
+        """max_age: entries stored more than this many seconds ago count as misses and are dropped."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache_entries WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is not None and max_age is not None and time.time() - row[1] > max_age:
+                self._conn.execute("DELETE FROM cache_entries WHERE cache_key = ?", (key,))
+                row = None
+            if row is None:
+                self._bump("misses")
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE cache_entries SET accessed_at = ?, hits = hits + 1 WHERE cache_key = ?",
+                (time.time(), key)
+            )
+            self._bump("hits")
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, value):
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO cache_entries
+                    (cache_key, value, size, created_at, accessed_at, hits)
+                VALUES (?, ?, ?, ?, ?, 0)
+                """,
+                (key, payload, size, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        rows = self._conn.execute(
+            "SELECT cache_key, size FROM cache_entries ORDER BY accessed_at ASC"
+        ).fetchall()
+        for cache_key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM cache_entries WHERE cache_key = ?", (cache_key,))
+            total -= size
+            evicted += 1
+        self._bump("evictions", evicted)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._conn.execute("SELECT name, value FROM cache_stats").fetchall())
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+            ).fetchone()
+
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": counters["hits"],
+            "misses": counters["misses"],
+            "evictions": counters["evictions"],
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+class MemoryLruCache:
+    """
+    In-process LRU cache with a byte budget and an optional time-to-live.
+
+    Values are kept as their JSON payload, so every get returns a fresh
+    copy and the payload length is the size counted against max_bytes.
+    Counters are per process.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (payload, size, stored_at)
+        self._size = 0
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def _drop(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.time() - entry[2] > self.ttl:
+                self._drop(key)
+                self._counts["expired"] += 1
+                entry = None
+            if entry is None:
+                self._counts["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counts["hits"] += 1
+        return json.loads(entry[0])
+
+    def put(self, key: str, value):
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode("utf-8")) + len(key)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (payload, size, time.time())
+            self._size += size
+            while self._size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._counts["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            entries, size = len(self._entries), self._size
+
+        lookups = counts["hits"] + counts["misses"]
+        return {
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            **counts,
+            "hit_rate": round(counts["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+class BinaryArrayCache:
+    """
+    Directory of binarized (0/255) images stored one bit per pixel.
+
+    Each entry is a plain .npy file holding np.packbits of the image rows,
+    an eighth of the uint8 size. This is a compact cache, not a zero-copy
+    one: get_packed returns the memory-mapped bits without reading them,
+    but get unpacks them into a new 0/255 array on every hit, because
+    Tesseract needs 8-bit pixels. The padded-out width isn't stored: callers
+    pass the shape they expect, which follows from what they keyed the
+    entry on.
+    Files are written atomically, so several workers can share a directory.
+    When the directory grows past max_bytes the least recently read files
+    are removed. Hit/miss counts are per process.
+    """
+
+    def __init__(self, directory, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._size = sum(path.stat().st_size for path in self.directory.glob("*/*.npy"))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.npy"
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get_packed(self, key: str, shape):
+        """The stored bits as a read-only memory map, or None on a miss."""
+        height, width = shape
+        path = self._path(key)
+        try:
+            packed = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+        if packed.dtype != np.uint8 or packed.shape != (height, (width + 7) // 8):
+            self._count("misses")
+            return None
+
+        try:
+            os.utime(path)  # mtime doubles as the last-read time for eviction
+        except OSError:
+            pass
+        self._count("hits")
+        return packed
+
+    def get(self, key: str, shape):
+        """The stored image as a new 0/255 uint8 array of the given shape, or None."""
+        packed = self.get_packed(key, shape)
+        if packed is None:
+            return None
+        binary = np.unpackbits(packed, axis=1, count=shape[1])
+        np.multiply(binary, 255, out=binary)
+        return binary
+
+    def put(self, key: str, binary):
+        packed = np.packbits(binary > 0, axis=1)
+        if packed.nbytes > self.max_bytes:
+            return
+
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, packed)
+            size = os.path.getsize(tmp_path)
+            try:
+                # An entry written again replaces its file
+                size -= path.stat().st_size
+            except OSError:
+                pass
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print("[CACHE WARNING] could not store binary:", e)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._size += size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        files = []
+        for path in self.directory.glob("*/*.npy"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda f: f[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._size = total
+
+    def clear(self):
+        with self._lock:
+            for path in self.directory.glob("*/*.npy"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = sum(1 for _ in self.directory.glob("*/*.npy"))
+            lookups = self.hits + self.misses
+            return {
+                "path": str(self.directory),
+                "entries": entries,
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
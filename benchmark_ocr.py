@@ -0,0 +1,215 @@
+"""
+OCR benchmark over the newspaper scans bundled in app/services/.
+
+Runs the full OCR pipeline (decode, deskew, preprocessing, every PSM pass)
+on each image with the result cache disabled and records, per image and
+profile, the median wall time of every stage, the peak working-buffer
+memory and the number of characters extracted.
+
+    python benchmark_ocr.py --profile fast --profile quality --repeat 3
+    python benchmark_ocr.py --baseline benchmarks/ocr-abc1234.json --threshold 10
+    python benchmark_ocr.py --cascade
+    python benchmark_ocr.py --reuse-binaries --repeat 3
+
+The results are written as JSON (default benchmarks/ocr-<commit>.json) so
+runs can be compared across commits. With --baseline, any image whose
+median total time is more than --threshold percent slower, or whose text
+is more than --chars-threshold percent shorter, than in the baseline is
+reported and the script exits with status 1. A run that fails (the OCR
+pipeline reports no stage timings, e.g. tesseract is missing) is recorded
+as failed, never as a fast run, and also makes the script exit with 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Ensure the current directory is in the path so we can import app modules
+sys.path.append(os.getcwd())
+
+import cv2
+import pytesseract
+
+from app.services import ocr_processor
+from app.services.ocr_processor import PREPROCESS_PROFILES, OCR_CONCURRENT, OCR_MAX_WORKERS, ocr_image_bytes
+
+SAMPLES_DIR = Path(__file__).resolve().parent / "app" / "services"
+SAMPLE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).resolve().parent, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def tesseract_version() -> str:
+    try:
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return "unknown"
+
+
+def sample_images():
+    return sorted(p for p in SAMPLES_DIR.iterdir() if p.suffix.lower() in SAMPLE_EXTENSIONS)
+
+
+def benchmark_image(path: Path, profile: str, repeat: int, split_articles: bool, cascade: bool = False) -> dict:
+    image_bytes = path.read_bytes()
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = ocr_image_bytes(image_bytes, use_cache=False, split_articles=split_articles, profile=profile,
+                                 cascade=cascade)
+        wall_ms = (time.perf_counter() - started) * 1000.0
+        # ocr_image_bytes logs and swallows pipeline errors; they leave no stage timings
+        if not result["metadata"].get("stage_ms"):
+            return {
+                "image": path.name,
+                "bytes": len(image_bytes),
+                "profile": profile,
+                "failed": True,
+                "error": "OCR pipeline failed (no stage timings; see the [OCR ERROR] log)",
+            }
+        runs.append((wall_ms, result))
+
+    metadata = runs[-1][1]["metadata"]
+    articles = runs[-1][1]["articles"]
+    stages = sorted({stage for _, result in runs for stage in result["metadata"].get("stage_ms", {})})
+    return {
+        "image": path.name,
+        "bytes": len(image_bytes),
+        "profile": profile,
+        "runs": repeat,
+        "total_ms": round(statistics.median(wall for wall, _ in runs), 2),
+        "stage_ms": {
+            stage: round(statistics.median(r["metadata"].get("stage_ms", {}).get(stage, 0.0) for _, r in runs), 2)
+            for stage in stages
+        },
+        "peak_working_bytes": max(r["metadata"].get("peak_working_bytes", 0) for _, r in runs),
+        "scale": metadata.get("scale"),
+        "skew_angle": metadata.get("skew_angle"),
+        "articles": len(articles),
+        "cascade_skipped": metadata.get("cascade_skipped"),
+        "chars": sum(len(text) for text in articles),
+    }
+
+
+def compare(results, baseline, threshold: float, chars_threshold: float):
+    """
+    (image, profile, metric, baseline, current, change %) for every slowdown
+    beyond threshold and every drop in extracted characters beyond
+    chars_threshold. Failed runs (here or in the baseline) are skipped.
+    """
+    previous = {(r["image"], r["profile"]): r for r in baseline["results"] if not r.get("failed")}
+    regressions = []
+    for result in results:
+        before = previous.get((result["image"], result["profile"]))
+        if not before or result.get("failed"):
+            continue
+        if before["total_ms"]:
+            change = (result["total_ms"] - before["total_ms"]) / before["total_ms"] * 100.0
+            if change > threshold:
+                regressions.append(
+                    (result["image"], result["profile"], "ms", before["total_ms"], result["total_ms"], change)
+                )
+        if before.get("chars"):
+            change = (result["chars"] - before["chars"]) / before["chars"] * 100.0
+            if -change > chars_threshold:
+                regressions.append(
+                    (result["image"], result["profile"], "chars", before["chars"], result["chars"], change)
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the OCR pipeline on the bundled newspaper scans")
+    parser.add_argument("--image", action="append", help="Image to benchmark (default: all bundled samples)")
+    parser.add_argument("--profile", action="append", choices=sorted(PREPROCESS_PROFILES),
+                        help="Preprocessing profile, may be repeated (default: quality)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per image; medians are reported")
+    parser.add_argument("--articles", action="store_true", help="Benchmark article-block splitting")
+    parser.add_argument("--cascade", action="store_true",
+                        help="Benchmark cascade mode (only crime blocks get full OCR)")
+    parser.add_argument("--reuse-binaries", action="store_true",
+                        help="Load preprocessed binaries from the binary cache (times Tesseract, not preprocessing)")
+    parser.add_argument("--output", help="JSON output path (default: benchmarks/ocr-<commit>.json)")
+    parser.add_argument("--baseline", help="Earlier benchmark JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Allowed slowdown in percent before a regression is reported")
+    parser.add_argument("--chars-threshold", type=float, default=10.0,
+                        help="Allowed drop in extracted characters in percent before a regression is reported")
+    args = parser.parse_args()
+    # Preprocessing is part of what is measured unless asked otherwise
+    ocr_processor.OCR_BINARY_CACHE_ENABLED = args.reuse_binaries
+
+    images = [Path(p) for p in args.image] if args.image else sample_images()
+    profiles = args.profile or ["quality"]
+    commit = git_commit()
+
+    results = []
+    for profile in profiles:
+        for path in images:
+            result = benchmark_image(path, profile, args.repeat, args.articles, args.cascade)
+            results.append(result)
+            if result.get("failed"):
+                print(f"{path.name:<20} {profile:<9} FAILED: {result['error']}")
+                continue
+            print(
+                f"{path.name:<20} {profile:<9} {result['total_ms']:>9.1f} ms  "
+                f"peak {result['peak_working_bytes'] / 1e6:>7.1f} MB  {result['chars']:>6} chars"
+            )
+
+    report = {
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "tesseract": tesseract_version(),
+            "cpu_count": os.cpu_count(),
+            "ocr_concurrent": OCR_CONCURRENT,
+            "ocr_max_workers": OCR_MAX_WORKERS,
+        },
+        "split_articles": args.articles,
+        "cascade": args.cascade,
+        "reuse_binaries": args.reuse_binaries,
+        "results": results,
+    }
+
+    output = Path(args.output or f"benchmarks/ocr-{commit}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\nResults written to {output}")
+
+    failures = [result for result in results if result.get("failed")]
+    if failures:
+        print(f"\n{len(failures)} of {len(results)} runs failed")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold, args.chars_threshold)
+        if regressions:
+            print(
+                f"\nRegressions against {baseline.get('commit', args.baseline)} "
+                f"(> {args.threshold:.0f}% slower or > {args.chars_threshold:.0f}% fewer chars):"
+            )
+            for image, profile, metric, before, after, change in regressions:
+                print(f"  {image:<20} {profile:<9} {before:>9.1f} -> {after:>9.1f} {metric:<5} ({change:+.1f}%)")
+            sys.exit(1)
+        print(f"\nNo regressions against {baseline.get('commit', args.baseline)}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
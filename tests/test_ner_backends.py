@@ -0,0 +1,137 @@
+import pytest
+
+from app.services import keyword_extractor, ner_backends
+from app.services.ner_backends import NerBackend, RuleNerBackend, set_ner_backend, tag_texts
+
+
+class StandInBackend(NerBackend):
+    """Tags every text with one fixed person and records each batch it sees."""
+    name = "stand-in"
+
+    def __init__(self, fail=()):
+        self.batches = []
+        self.fail = set(fail)
+
+    def config(self) -> dict:
+        return {"backend": self.name}
+
+    def tag_batch(self, texts) -> list:
+        self.batches.append(list(texts))
+        return [None if text in self.fail else
+                [{"entity_group": "PER", "word": "स्टैंड इन", "start": 0, "end": 8, "score": 0.99}]
+                for text in texts]
+
+
+@pytest.fixture(autouse=True)
+def fresh_ner_state(monkeypatch):
+    # Memory tier only, empty for every test; the env backend afterwards
+    monkeypatch.setenv("NER_CACHE_DISK", "0")
+    monkeypatch.setattr(ner_backends, "NER_CACHE_DISK", False)
+    monkeypatch.setattr(ner_backends, "_ner_memory_cache", None)
+    monkeypatch.setattr(ner_backends, "_ner_disk_cache", None)
+    monkeypatch.setattr(ner_backends, "_ner_worker_counts", {"hits": 0, "misses": 0})
+    yield
+    set_ner_backend(None)
+    keyword_extractor._reset_analyze_pool()
+
+
+def words(entities):
+    return [entity["word"] for entity in entities]
+
+
+def test_rule_tagger_names_after_role_cue():
+    text = "आरोपी रमेश कुमार को पुलिस ने गिरफ्तार किया।"
+    (entity,) = RuleNerBackend().tag(text)
+    assert entity["entity_group"] == "PER"
+    assert entity["word"] == "रमेश कुमार"
+    assert text[entity["start"]:entity["end"]] == entity["word"]
+
+
+def test_rule_tagger_names_before_kinship_cue():
+    assert words(RuleNerBackend().tag("सुरेश यादव पिता रामलाल उम्र 30 वर्ष")) == ["सुरेश यादव", "रामलाल"]
+
+
+def test_rule_tagger_stops_at_sentence_end():
+    assert words(RuleNerBackend().tag("श्री मोहन लाल शर्मा. पुलिस जांच कर रही है")) == ["मोहन लाल शर्मा"]
+
+
+def test_rule_tagger_without_names():
+    assert RuleNerBackend().tag("कल रात मोहल्ले में चोरी हुई") == []
+
+
+def test_tag_texts_batches_and_deduplicates():
+    backend = StandInBackend()
+    set_ner_backend(backend)
+
+    results = tag_texts(["पहली  खबर", "दूसरी खबर", "पहली खबर"])
+
+    # One backend call; whitespace variants of a text are tagged once
+    assert backend.batches == [["पहली खबर", "दूसरी खबर"]]
+    assert [words(entities) for entities in results] == [["स्टैंड इन"]] * 3
+
+    tag_texts(["दूसरी खबर"])
+    assert len(backend.batches) == 1
+
+
+def test_tag_texts_does_not_cache_failures():
+    backend = StandInBackend(fail={"खराब खबर"})
+    set_ner_backend(backend)
+
+    assert tag_texts(["खराब खबर", "अच्छी खबर"]) == [[], [{
+        "entity_group": "PER", "word": "स्टैंड इन", "start": 0, "end": 8, "score": 0.99
+    }]]
+    tag_texts(["खराब खबर", "अच्छी खबर"])
+    assert backend.batches[-1] == ["खराब खबर"]
+
+
+ARTICLES = [
+    "कल रात मोहल्ले में चोरी हुई और अज्ञात चोर सामान ले गए",
+    "थाना कोतवाली क्षेत्र में मारपीट की घटना हुई",
+    "आरोपी रमेश कुमार को पुलिस ने गिरफ्तार किया",
+    "गांव में हत्या के मामले में जांच जारी है",
+    "कल रात मोहल्ले में चोरी हुई और अज्ञात चोर सामान ले गए",
+]
+
+
+@pytest.fixture
+def pool_settings(monkeypatch):
+    # Small enough that the five articles above take the pool path
+    monkeypatch.setattr(keyword_extractor, "ANALYZE_PARALLEL", True)
+    monkeypatch.setattr(keyword_extractor, "ANALYZE_WORKERS", 2)
+    monkeypatch.setattr(keyword_extractor, "ANALYZE_PARALLEL_MIN", 2)
+    monkeypatch.setattr(keyword_extractor, "ANALYZE_CHUNK_SIZE", 2)
+
+
+def test_analyze_articles_uses_installed_backend(pool_settings):
+    backend = StandInBackend()
+    set_ner_backend(backend)
+
+    serial = keyword_extractor.analyze_articles(ARTICLES, parallel=False)
+    parallel = keyword_extractor.analyze_articles(ARTICLES, parallel=True)
+
+    assert parallel == serial
+    assert len(serial) == len(ARTICLES)
+    # Articles without a pattern match get the stand-in's name as accused
+    assert serial[0][5] == "स्टैंड इन"
+    assert serial[0] == serial[4]
+
+
+def test_analyze_articles_pool_matches_serial(pool_settings):
+    serial = keyword_extractor.analyze_articles(ARTICLES, parallel=False)
+    assert keyword_extractor.analyze_articles(ARTICLES, parallel=True) == serial
+
+
+def test_analyze_articles_repeats_rows_for_duplicates():
+    rows = keyword_extractor.analyze_articles(ARTICLES)
+    assert rows[4] == rows[0]
+    assert rows[4] is not rows[0]
+
+
+def test_pool_reports_worker_cache_counts(pool_settings):
+    keyword_extractor.analyze_articles(ARTICLES, parallel=True)
+
+    # Worker lookups are counted without turning the disk tier on
+    stats = ner_backends.ner_cache_stats()
+    assert stats["workers"]["misses"] > 0
+    assert stats["memory"]["misses"] == 0
+    assert stats["disk"] == {"enabled": False}